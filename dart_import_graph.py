@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Dart Import Graph
+Indexes import/export/part directives of the project's Dart files so tooling
+can work out which files are affected when others change
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+
+DEFAULT_ROOTS = ('lib', 'test', 'integration_test')
+DEFAULT_CACHE = os.path.join('.dart_tool', 'dart_import_graph.json')
+# Bumped whenever the cached per-file entries change shape
+CACHE_VERSION = 2
+
+# `part of` is deliberately not matched: the library's `part` directive already links the two
+DIRECTIVE_PATTERN = re.compile(
+    r"""^\s*(import|export|part)\s+['"]([^'"]+)['"]""",
+    re.MULTILINE
+)
+
+
+def read_package_name(pubspec: str = 'pubspec.yaml') -> str:
+    """Read the package name from pubspec.yaml"""
+    try:
+        with open(pubspec, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('name:'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return ''
+
+
+class DartImportGraph:
+    """Forward and reverse dependency graph between the project's Dart files.
+
+    Parsed directives are cached per file together with its mtime, size and
+    content hash. A file is only re-read when its mtime or size changed, and
+    only re-parsed when its content hash changed too.
+    """
+
+    def __init__(self, roots: Iterable[str] = DEFAULT_ROOTS, cache_path: str = DEFAULT_CACHE,
+                 package_name: str = None):
+        self.roots = [root for root in roots if os.path.isdir(root)]
+        self.cache_path = cache_path
+        self.package_name = package_name if package_name is not None else read_package_name()
+        # File -> the project files its directives point to, including ones that do not exist
+        self.imports: Dict[str, List[str]] = {}
+        self.hashes: Dict[str, str] = {}
+        # Library -> the files it includes with `part`; those are also listed in imports
+        self.parts: Dict[str, List[str]] = {}
+        self._dependents = None
+
+    def build(self) -> 'DartImportGraph':
+        """Index every Dart file under the roots, reusing cached entries where possible"""
+        cache = self._load_cache()
+        entries = {}
+        for path in self._dart_files():
+            stat = os.stat(path)
+            entry = cache.get(path)
+            if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                entries[path] = entry
+                continue
+            with open(path, 'rb') as f:
+                content = f.read()
+            digest = hashlib.sha1(content).hexdigest()
+            if entry and entry['hash'] == digest:
+                directives = entry['directives']
+            else:
+                directives = DIRECTIVE_PATTERN.findall(content.decode('utf-8', errors='replace'))
+            entries[path] = {
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'hash': digest,
+                'directives': directives
+            }
+
+        self.hashes = {path: entry['hash'] for path, entry in entries.items()}
+        self.imports = {}
+        self.parts = {}
+        for path, entry in entries.items():
+            targets = {kind: set() for kind in ('import', 'export', 'part')}
+            for kind, uri in entry['directives']:
+                target = self.resolve(path, uri)
+                # Kept even if the target does not exist (any more), so that deleting or
+                # renaming a file still reaches the files that import it
+                if target is not None:
+                    targets[kind].add(target)
+            self.imports[path] = sorted(set().union(*targets.values()))
+            parts = [part for part in targets['part'] if part in entries]
+            if parts:
+                self.parts[path] = sorted(parts)
+        self._dependents = None
+        self._save_cache(entries)
+        return self
+
+    def resolve(self, source: str, uri: str) -> str:
+        """Map a directive URI to a project-relative path, or None for external libraries"""
+        if uri.startswith('package:'):
+            package, _, path = uri[len('package:'):].partition('/')
+            if package != self.package_name:
+                return None
+            return os.path.normpath(os.path.join('lib', path))
+        if ':' in uri:
+            # dart:, file: and other schemes are outside the project graph
+            return None
+        return os.path.normpath(os.path.join(os.path.dirname(source), uri))
+
+    @property
+    def dependents(self) -> Dict[str, Set[str]]:
+        """Reverse graph: for each file, the files that import it directly"""
+        if self._dependents is None:
+            reverse = defaultdict(set)
+            for path, targets in self.imports.items():
+                for target in targets:
+                    reverse[target].add(path)
+            self._dependents = dict(reverse)
+        return self._dependents
+
+    @property
+    def library_of(self) -> Dict[str, str]:
+        """For each part file, the library that includes it"""
+        return {part: library for library, parts in self.parts.items() for part in parts}
+
+    def affected_by(self, changed: Iterable[str]) -> Set[str]:
+        """All files that (transitively) depend on any of the changed files, including them"""
+        pending = [os.path.normpath(path) for path in changed]
+        affected = set()
+        while pending:
+            path = pending.pop()
+            if path in affected:
+                continue
+            affected.add(path)
+            pending.extend(self.dependents.get(path, ()))
+        return affected
+
+    def transitive_imports(self, path: str) -> Set[str]:
+        """The file itself plus every project file it (transitively) imports"""
+        pending = [os.path.normpath(path)]
+        seen = set()
+        while pending:
+            current = pending.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            pending.extend(self.imports.get(current, ()))
+        return seen
+
+    def _dart_files(self) -> List[str]:
+        files = []
+        for root in self.roots:
+            for directory, _, names in os.walk(root):
+                files.extend(os.path.join(directory, name) for name in names if name.endswith('.dart'))
+        return sorted(files)
+
+    def _load_cache(self) -> Dict:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != CACHE_VERSION or data.get('package') != self.package_name:
+            return {}
+        return data.get('files', {})
+
+    def _save_cache(self, entries: Dict):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            temp_path = f"{self.cache_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'package': self.package_name, 'files': entries}, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            # The cache only saves time; failing to write it is not an error
+            pass
@@ -0,0 +1,56 @@
+"""
+Flutter Analysis
+Library behind flutter_report.py and scripts/info.py: runs the Dart analyzer,
+parses its output into Issue records, renders reports and keeps the history
+of runs.
+
+    from flutter_analysis import parse_issues, render
+    issues = parse_issues(output)
+    print(render('sarif', issues, run_time))
+
+Names are imported from their submodules on first access, so importing the
+package costs nothing until a part of it is used.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'Issue': 'issues',
+    'group_issues': 'issues',
+    'issue_sort_key': 'issues',
+    'iter_issues': 'parser',
+    'parse_issue_line': 'parser',
+    'parse_issues': 'parser',
+    'parse_analyze_output': 'parser',
+    'analyze_paths': 'runner',
+    'iter_analyze': 'runner',
+    'project_dart_files': 'runner',
+    'run_analyze': 'runner',
+    'run_incremental_analyze': 'incremental',
+    'RENDERERS': 'renderers',
+    'render': 'renderers',
+    'renderer': 'renderers',
+    'AnalyzeHistory': 'history',
+    'diff_issues': 'diff',
+    'fingerprint_issues': 'diff',
+    'iter_fingerprinted': 'diff',
+    'WRITERS': 'writers',
+    'IssueWriter': 'writers',
+    'JsonLinesWriter': 'writers',
+    'SarifWriter': 'writers',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,305 @@
+"""
+Analyze Report CLI
+Command line front end of flutter_report.py. Only argparse is imported up
+front; each command imports the parts of the library it uses, so `--help`
+and the commands that read recorded runs start without loading the runner,
+the import graph or the analyzer cache.
+"""
+
+import argparse
+import os
+from datetime import datetime
+
+from . import paths
+
+
+def render_run(history, run_id: int, format_name: str = "markdown"):
+    """Report of a recorded run"""
+    from .renderers import render
+
+    run = history.run(run_id)
+    if not run["compacted"]:
+        return render(format_name, history.issues(run_id), run["run_time"])
+    if format_name != "markdown":
+        raise SystemExit(f"Run #{run_id} was compacted; only its totals are left, in the markdown report")
+
+    # Compaction dropped the issues themselves; only the totals are left
+    md = [f"# Flutter Analyze Report — {run['run_time']}\n"]
+    md.append("> Issue details of this run were compacted; only totals are kept\n")
+    md.append("### Summary\n")
+    for level in ("info", "warning", "error"):
+        md.append(f"- **{level.capitalize()}s**: {run[level + 's']}")
+    return "\n".join(md)
+
+
+def format_run(run: dict):
+    return (
+        f"- #{run['id']} {run['run_time']} "
+        f"— Infos: {run['infos']}, "
+        f"Warnings: {run['warnings']}, "
+        f"Errors: {run['errors']}"
+        + (" (compacted)" if run["compacted"] else "")
+    )
+
+
+def show_command(history, args):
+    run_id = args.run or history.latest_run_id()
+    if run_id is None or history.run(run_id) is None:
+        raise SystemExit(f"No recorded run {args.run or ''}".strip())
+    if args.format in STREAMED_FORMATS:
+        from .writers import WRITERS
+
+        if history.run(run_id)["compacted"]:
+            raise SystemExit(f"Run #{run_id} was compacted; only its totals are left, in the markdown report")
+        # Streamed from the database, so exporting a huge run does not hold it in memory
+        with WRITERS[args.format](args.output or "-") as writer:
+            writer.write_all(history.iter_issues(run_id))
+        if args.output:
+            print(f"✅ Report saved: {args.output}")
+        return
+    report = render_run(history, run_id, args.format)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"✅ Report saved: {args.output}")
+    else:
+        print(report)
+
+
+def runs_command(history, args):
+    print("# Flutter Analyze History\n")
+    for run in history.runs(args.last):
+        print(format_run(run))
+
+
+def load_baseline(history, ref: str, latest_run_id=None):
+    """Issues of a baseline: a run id, "previous" (the newest run before this one) or an exported JSON file"""
+    import json
+
+    from .issues import Issue
+
+    if ref == "previous":
+        if latest_run_id is None:
+            raise SystemExit("No previous run to compare against")
+        ref = str(latest_run_id)
+    if not ref.isdigit():
+        try:
+            with open(ref, encoding="utf-8") as f:
+                return [Issue.from_dict(data) for data in json.load(f)["issues"]]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise SystemExit(f"Cannot read baseline {ref}: {e}")
+
+    run = history.run(int(ref))
+    if run is None:
+        raise SystemExit(f"No recorded run {ref}")
+    if run["compacted"]:
+        raise SystemExit(f"Run #{ref} was compacted; its issues are no longer available as a baseline")
+    issues = history.issues(int(ref))
+    if any(issue.fingerprint is None for issue in issues):
+        raise SystemExit(f"Run #{ref} was recorded without fingerprints and cannot be used as a baseline")
+    return issues
+
+
+def generate_diff_markdown(diff: dict, base: str, head: str):
+    from .issues import issue_sort_key
+
+    md = [f"# Flutter Analyze Diff — {base} → {head}\n"]
+    md.append("### Summary\n")
+    for kind in ("new", "fixed", "persisting"):
+        md.append(f"- **{kind.capitalize()}**: {len(diff[kind])}")
+    md.append("")
+
+    for kind in ("new", "fixed"):
+        if not diff[kind]:
+            continue
+        md.append(f"## {kind.capitalize()} issues\n")
+        for issue in sorted(diff[kind], key=issue_sort_key):
+            md.append(
+                f"- **{issue.level.capitalize()}**: {issue.message}  \n"
+                f"  📍 {issue.file}:{issue.line}:{issue.col}  "
+                f"(_Rule: `{issue.rule}`_)\n"
+            )
+    return "\n".join(md)
+
+
+def diff_command(history, args):
+    from .diff import diff_issues
+
+    head = args.head or history.latest_run_id()
+    if head is None:
+        raise SystemExit("No recorded runs")
+    diff = diff_issues(load_baseline(history, args.base), load_baseline(history, str(head)))
+    base_label = f"#{args.base}" if args.base.isdigit() else args.base
+    print(generate_diff_markdown(diff, base_label, f"#{head}"))
+
+
+def baseline_command(history, args):
+    from .renderers import render_json
+
+    run_id = args.run or history.latest_run_id()
+    if run_id is None:
+        raise SystemExit("No recorded runs")
+    issues = load_baseline(history, str(run_id))
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(render_json(issues, history.run(run_id)["run_time"]))
+    print(f"✅ Baseline of run #{run_id} saved: {args.output}")
+
+
+def rules_command(history, args):
+    totals = history.rule_totals(args.last)
+    print(f"Issues per rule over the last {args.last} run(s):\n")
+    width = max((len(rule) for rule, _, _ in totals), default=4)
+    print(f"{'rule':<{width}}  {'total':>8}  {'latest':>8}")
+    for rule, total, latest in totals:
+        print(f"{rule:<{width}}  {total:>8}  {latest:>8}")
+
+
+COMMANDS = {
+    "show": show_command,
+    "runs": runs_command,
+    "rules": rules_command,
+    "diff": diff_command,
+    "baseline": baseline_command,
+}
+REPORT_FORMATS = ("markdown", "json", "jsonl", "sarif")
+# Formats with a streaming writer in flutter_analysis.writers
+STREAMED_FORMATS = ("jsonl", "sarif")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Run flutter analyze, record the run in the history database and "
+        "write reports/latest.md. Recorded runs can be rendered again with the subcommands."
+    )
+    parser.add_argument(
+        "--history",
+        default=paths.DEFAULT_DATABASE,
+        metavar="PATH",
+        help=f"History database (default: {paths.DEFAULT_DATABASE})",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only analyze Dart files whose sources or transitive imports changed since the last "
+        "--incremental run, reusing cached issues for the rest",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Split the project's Dart files into N chunks of similar size and analyze them concurrently",
+    )
+    parser.add_argument(
+        "--machine",
+        action="store_true",
+        help="Run `dart analyze --format=machine` and parse its pipe-delimited output",
+    )
+    parser.add_argument(
+        "--keep-details",
+        type=int,
+        default=50,
+        metavar="N",
+        help="Keep the individual issues of the newest N runs; older runs keep only totals (default: 50)",
+    )
+    parser.add_argument(
+        "--keep-runs",
+        type=int,
+        metavar="N",
+        help="Delete runs older than the newest N entirely (default: keep every run's totals)",
+    )
+    parser.add_argument(
+        "--baseline",
+        nargs="?",
+        const="previous",
+        metavar="REF",
+        help="Compare against a baseline and exit with 1 only if there are new issues. REF is a run id, "
+        "\"previous\" (the default) or a JSON file written by the baseline subcommand",
+    )
+    parser.add_argument("--sarif", metavar="PATH", help="Also write the issues as a SARIF 2.1.0 log")
+    parser.add_argument("--jsonl", metavar="PATH", help="Also write the issues as JSON lines")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    show = commands.add_parser("show", help="Print the report of a recorded run")
+    show.add_argument("run", nargs="?", type=int, help="Run id (default: the latest run)")
+    show.add_argument("-o", "--output", metavar="PATH", help="Write the report to PATH instead of stdout")
+    show.add_argument("--format", choices=REPORT_FORMATS, default="markdown", help="Report format (default: markdown)")
+    runs = commands.add_parser("runs", help="List recorded runs, newest first")
+    runs.add_argument("--last", type=int, default=20, metavar="N", help="Number of runs (default: 20)")
+    rules = commands.add_parser("rules", help="Issue count per rule over the most recent runs")
+    rules.add_argument("--last", type=int, default=100, metavar="N", help="Number of runs (default: 100)")
+    diff = commands.add_parser("diff", help="New, fixed and persisting issues between two recorded runs")
+    diff.add_argument("base", help="Baseline run id or exported JSON file")
+    diff.add_argument("head", nargs="?", type=int, help="Run id (default: the latest run)")
+    baseline = commands.add_parser("baseline", help="Export the issues of a run as a JSON baseline")
+    baseline.add_argument("run", nargs="?", type=int, help="Run id (default: the latest run)")
+    baseline.add_argument("-o", "--output", required=True, metavar="PATH", help="JSON file to write")
+    return parser
+
+
+def analyze_command(args):
+    from .diff import diff_issues, fingerprint_issues
+    from .history import AnalyzeHistory
+    from .issues import issue_sort_key
+    from .renderers import render_markdown
+
+    run_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if args.incremental:
+        from .incremental import run_incremental_analyze
+
+        issue_list = run_incremental_analyze(args.jobs, args.machine)
+    else:
+        from .runner import run_analyze
+
+        issue_list = run_analyze(jobs=args.jobs, machine=args.machine)
+    fingerprint_issues(issue_list)
+
+    with AnalyzeHistory(args.history) as history:
+        # Resolved before recording so "previous" does not pick this run
+        baseline = args.baseline and load_baseline(history, args.baseline, history.latest_run_id())
+        run_id = history.record_run(issue_list, run_time)
+        compacted, deleted = history.compact(args.keep_details, args.keep_runs)
+
+    os.makedirs(paths.REPORTS_DIR, exist_ok=True)
+    with open(paths.LATEST_REPORT, "w", encoding="utf-8") as f:
+        f.write(render_markdown(issue_list, run_time))
+
+    print(f"✅ Run #{run_id} recorded: {args.history}")
+    if compacted or deleted:
+        print(f"🗜️  Retention: {compacted} run(s) compacted, {deleted} run(s) deleted")
+    print(f"✨ Latest report: {paths.LATEST_REPORT}")
+
+    for format_name, output in (("sarif", args.sarif), ("jsonl", args.jsonl)):
+        if output:
+            from .writers import WRITERS
+
+            with WRITERS[format_name](output) as writer:
+                writer.write_all(sorted(issue_list, key=issue_sort_key))
+            print(f"📝 Wrote {output}")
+
+    if args.baseline:
+        diff = diff_issues(baseline, issue_list)
+        print(
+            f"🔍 Against baseline {args.baseline}: {len(diff['new'])} new, "
+            f"{len(diff['fixed'])} fixed, {len(diff['persisting'])} persisting"
+        )
+        for issue in sorted(diff["new"], key=issue_sort_key):
+            print(
+                f"  ❌ {issue.level} • {issue.message} • "
+                f"{issue.file}:{issue.line}:{issue.col} • {issue.rule}"
+            )
+        if diff["new"]:
+            raise SystemExit(1)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command:
+        from .history import AnalyzeHistory
+
+        with AnalyzeHistory(args.history) as history:
+            COMMANDS[args.command](history, args)
+        return
+
+    analyze_command(args)
@@ -0,0 +1,85 @@
+"""
+Analyze Diff
+Fingerprints analyzer issues so the same issue can be recognised across
+runs after the code around it moved, and classifies the issues of a run
+as new, fixed or persisting against a baseline
+"""
+
+import hashlib
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List
+
+from .issues import Issue
+
+NUMBER_PATTERN = re.compile(r'\d+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_message(message: str) -> str:
+    """Drop what changes when code merely moves: numbers (e.g. line references) and spacing"""
+    return WHITESPACE_PATTERN.sub(' ', NUMBER_PATTERN.sub('#', message)).strip()
+
+
+def normalize_code(line: str) -> str:
+    return WHITESPACE_PATTERN.sub(' ', line).strip()
+
+
+def fingerprint(issue: Issue, code: str) -> str:
+    """Hash of the rule, file, normalised message and the flagged source line, but not its position"""
+    key = '\0'.join((issue.rule, issue.file, normalize_message(issue.message), normalize_code(code)))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def iter_fingerprinted(issues: Iterable[Issue]) -> Iterator[Issue]:
+    """Fingerprint issues as they stream past.
+
+    The analyzer reports issues file by file, so only the sources of the
+    last few flagged files are kept.
+    """
+    @lru_cache(maxsize=32)
+    def source_lines(path: str) -> List[str]:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return f.read().splitlines()
+        except OSError:
+            return []
+
+    for issue in issues:
+        lines = source_lines(issue.file)
+        line_index = issue.line - 1
+        code = lines[line_index] if 0 <= line_index < len(lines) else ''
+        issue.fingerprint = fingerprint(issue, code)
+        yield issue
+
+
+def fingerprint_issues(issues: List[Issue]) -> List[Issue]:
+    """Add a fingerprint to every issue"""
+    for _ in iter_fingerprinted(issues):
+        pass
+    return issues
+
+
+def diff_issues(baseline: List[Issue], current: List[Issue]) -> Dict[str, List[Issue]]:
+    """Classify issues as new (only in current), fixed (only in baseline) or persisting.
+
+    Fingerprints are compared as multisets: when the same fingerprint occurs
+    more often than in the baseline, the extra occurrences are new.
+    """
+    remaining = Counter(issue.fingerprint for issue in baseline)
+    new, persisting = [], []
+    for issue in current:
+        if remaining[issue.fingerprint]:
+            remaining[issue.fingerprint] -= 1
+            persisting.append(issue)
+        else:
+            new.append(issue)
+
+    fixed = []
+    for issue in reversed(baseline):
+        if remaining[issue.fingerprint]:
+            remaining[issue.fingerprint] -= 1
+            fixed.append(issue)
+    fixed.reverse()
+    return {'new': new, 'fixed': fixed, 'persisting': persisting}
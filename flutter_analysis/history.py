@@ -0,0 +1,200 @@
+"""
+Analyze History
+Append-only SQLite store of flutter analyze runs and their issues, from
+which reports and trends are rendered on demand
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .issues import Issue
+from .paths import DEFAULT_DATABASE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_time TEXT NOT NULL,
+    infos INTEGER NOT NULL,
+    warnings INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    -- Whether the issues rows of this run were dropped by compaction
+    compacted INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rules (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS issues (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    level TEXT NOT NULL,
+    rule_id INTEGER NOT NULL REFERENCES rules(id),
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    line INTEGER NOT NULL,
+    col INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    fingerprint TEXT
+);
+CREATE INDEX IF NOT EXISTS issues_by_run ON issues(run_id);
+CREATE INDEX IF NOT EXISTS issues_by_rule ON issues(rule_id, run_id);
+CREATE INDEX IF NOT EXISTS issues_by_file ON issues(file_id, run_id);
+CREATE INDEX IF NOT EXISTS issues_by_level ON issues(level, run_id);
+-- Per-run totals, kept after compaction so trends stay cheap to query
+CREATE TABLE IF NOT EXISTS rule_counts (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    rule_id INTEGER NOT NULL REFERENCES rules(id),
+    level TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (run_id, rule_id, level)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rule_counts_by_rule ON rule_counts(rule_id, run_id);
+"""
+
+
+class AnalyzeHistory:
+    """Runs and issues of past analyze invocations.
+
+    Rows are only ever appended, except by compact(), which drops the issue
+    rows of old runs (keeping their per-rule totals) and then whole runs
+    beyond the retention limit.
+    """
+
+    def __init__(self, path: str = DEFAULT_DATABASE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA foreign_keys=ON')
+        self.db.executescript(SCHEMA)
+        columns = {row[1] for row in self.db.execute('PRAGMA table_info(issues)')}
+        if 'fingerprint' not in columns:
+            # Databases created before issues were fingerprinted
+            self.db.execute('ALTER TABLE issues ADD COLUMN fingerprint TEXT')
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self) -> 'AnalyzeHistory':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _ids(self, table: str, column: str, names: Iterable[str]) -> Dict[str, int]:
+        names = set(names)
+        self.db.executemany(f'INSERT OR IGNORE INTO {table} ({column}) VALUES (?)', ((name,) for name in names))
+        ids = {}
+        for name, row_id in self.db.execute(f'SELECT {column}, id FROM {table}'):
+            if name in names:
+                ids[name] = row_id
+        return ids
+
+    def record_run(self, issues: List[Issue], run_time: str = None) -> int:
+        """Store one run and its issues, returning the run id"""
+        run_time = run_time or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        levels = {'info': 0, 'warning': 0, 'error': 0}
+        rule_counts = {}
+        for issue in issues:
+            levels[issue.level] = levels.get(issue.level, 0) + 1
+            key = (issue.rule, issue.level)
+            rule_counts[key] = rule_counts.get(key, 0) + 1
+
+        with self.db:
+            run_id = self.db.execute(
+                'INSERT INTO runs (run_time, infos, warnings, errors) VALUES (?, ?, ?, ?)',
+                (run_time, levels['info'], levels['warning'], levels['error'])
+            ).lastrowid
+            rule_ids = self._ids('rules', 'name', (issue.rule for issue in issues))
+            file_ids = self._ids('files', 'path', (issue.file for issue in issues))
+            self.db.executemany(
+                'INSERT INTO issues (run_id, level, rule_id, file_id, line, col, message, fingerprint) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    (run_id, issue.level, rule_ids[issue.rule], file_ids[issue.file],
+                     issue.line, issue.col, issue.message, issue.fingerprint)
+                    for issue in issues
+                )
+            )
+            self.db.executemany(
+                'INSERT INTO rule_counts (run_id, rule_id, level, count) VALUES (?, ?, ?, ?)',
+                ((run_id, rule_ids[rule], level, count) for (rule, level), count in rule_counts.items())
+            )
+        return run_id
+
+    def latest_run_id(self) -> int:
+        row = self.db.execute('SELECT MAX(id) FROM runs').fetchone()
+        return row[0]
+
+    def run(self, run_id: int) -> Dict:
+        row = self.db.execute(
+            'SELECT id, run_time, infos, warnings, errors, compacted FROM runs WHERE id = ?', (run_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('id', 'run_time', 'infos', 'warnings', 'errors', 'compacted'), row))
+
+    def runs(self, last: int = 20) -> List[Dict]:
+        """The most recent runs, newest first"""
+        rows = self.db.execute(
+            'SELECT id, run_time, infos, warnings, errors, compacted FROM runs ORDER BY id DESC LIMIT ?', (last,)
+        )
+        return [dict(zip(('id', 'run_time', 'infos', 'warnings', 'errors', 'compacted'), row)) for row in rows]
+
+    def issues(self, run_id: int) -> List[Issue]:
+        """The issues of a run"""
+        return list(self.iter_issues(run_id))
+
+    def iter_issues(self, run_id: int) -> Iterator[Issue]:
+        """The issues of a run, fetched from the database as they are consumed"""
+        rows = self.db.execute(
+            """
+            SELECT issues.level, issues.message, files.path, issues.line, issues.col, rules.name, issues.fingerprint
+            FROM issues
+            JOIN files ON files.id = issues.file_id
+            JOIN rules ON rules.id = issues.rule_id
+            WHERE issues.run_id = ?
+            """,
+            (run_id,)
+        )
+        return (Issue(*row) for row in rows)
+
+    def rule_totals(self, last: int = 100) -> List[Tuple[str, int, int]]:
+        """(rule, issues over the last runs, issues in the latest run), most frequent first"""
+        return self.db.execute(
+            """
+            WITH recent AS (SELECT id FROM runs ORDER BY id DESC LIMIT ?)
+            SELECT rules.name,
+                   SUM(rule_counts.count),
+                   SUM(CASE WHEN rule_counts.run_id = (SELECT MAX(id) FROM recent) THEN rule_counts.count ELSE 0 END)
+            FROM rule_counts
+            JOIN rules ON rules.id = rule_counts.rule_id
+            WHERE rule_counts.run_id IN recent
+            GROUP BY rule_counts.rule_id
+            ORDER BY 2 DESC, rules.name
+            """,
+            (last,)
+        ).fetchall()
+
+    def compact(self, keep_details: int = 50, keep_runs: int = None) -> Tuple[int, int]:
+        """Apply the retention policy.
+
+        Issue rows are kept for the newest `keep_details` runs; older runs keep
+        only their totals. Runs beyond the newest `keep_runs` (None keeps all)
+        are deleted entirely. Returns (runs compacted, runs deleted).
+        """
+        with self.db:
+            compacted = self.db.execute(
+                """
+                UPDATE runs SET compacted = 1
+                WHERE compacted = 0 AND id NOT IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)
+                """,
+                (keep_details,)
+            ).rowcount
+            if compacted:
+                self.db.execute('DELETE FROM issues WHERE run_id IN (SELECT id FROM runs WHERE compacted = 1)')
+            deleted = 0
+            if keep_runs is not None:
+                stale = 'SELECT id FROM runs WHERE id NOT IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)'
+                self.db.execute(f'DELETE FROM issues WHERE run_id IN ({stale})', (keep_runs,))
+                self.db.execute(f'DELETE FROM rule_counts WHERE run_id IN ({stale})', (keep_runs,))
+                deleted = self.db.execute(f'DELETE FROM runs WHERE id IN ({stale})', (keep_runs,)).rowcount
+        return compacted, deleted
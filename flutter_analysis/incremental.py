@@ -0,0 +1,119 @@
+"""
+Incremental Analyze
+Re-analyzes only the Dart files whose sources or transitive imports changed
+since the last incremental run, reusing cached issues for the rest
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import List
+
+from dart_import_graph import DartImportGraph
+
+from . import paths
+from .issues import Issue
+from .runner import run_analyze
+
+ANALYZE_CACHE = Path(paths.ANALYZE_CACHE)
+# A change to any of these can change the issues of every file
+GLOBAL_ANALYZE_INPUTS = (
+    "analysis_options.yaml",
+    "pubspec.yaml",
+    "pubspec.lock",
+    ".dart_tool/package_config.json",
+)
+
+
+def hash_global_inputs():
+    digest = hashlib.sha256()
+    for name in GLOBAL_ANALYZE_INPUTS:
+        path = Path(name)
+        digest.update(name.encode("utf-8") + b"\0")
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def analysis_keys(graph: DartImportGraph):
+    """Hash of everything each file's issues depend on: itself and its transitive imports.
+
+    A part is analyzed as part of its library, so it takes the library's imports.
+    """
+    library_of = graph.library_of
+    keys = {}
+    for path in graph.hashes:
+        file = Path(path).as_posix()
+        digest = hashlib.sha256()
+        for dependency in sorted(graph.transitive_imports(library_of.get(path, path))):
+            if dependency in graph.hashes:
+                digest.update(f"{dependency}\0{graph.hashes[dependency]}\n".encode("utf-8"))
+        keys[file] = digest.hexdigest()
+    return keys
+
+
+def load_analyze_cache(global_hash: str):
+    """Cached (issues per Dart file, issues in other files), or empty ones if the global inputs changed"""
+    try:
+        data = json.loads(ANALYZE_CACHE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}, []
+    if data.get("global") != global_hash or "other" not in data:
+        return {}, []
+    return data.get("files", {}), data["other"]
+
+
+def save_analyze_cache(global_hash: str, entries: dict, other: list):
+    ANALYZE_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = ANALYZE_CACHE.with_suffix(".tmp")
+    temp_file.write_text(
+        json.dumps({"global": global_hash, "files": entries, "other": other}), encoding="utf-8"
+    )
+    temp_file.replace(ANALYZE_CACHE)
+
+
+def run_incremental_analyze(jobs: int = 1, machine: bool = False) -> List[Issue]:
+    """Analyze only files whose sources or imports changed since the last run.
+
+    Cached issues of unchanged files are merged with the fresh ones; after
+    group_issues() the result is the same as from a full run.
+    """
+    global_hash = hash_global_inputs()
+    cached, cached_other = load_analyze_cache(global_hash)
+    keys = analysis_keys(DartImportGraph().build())
+
+    stale = sorted(file for file, key in keys.items() if cached.get(file, {}).get("key") != key)
+    print(f"♻️  {len(keys) - len(stale)} of {len(keys)} file(s) unchanged since the last analyze")
+    fresh = []
+    full_run = len(stale) == len(keys)
+    if full_run:
+        # Nothing usable cached: one analyzer at the project root is cheaper than listing
+        # every file, and is what reports the issues outside the Dart files below
+        fresh = run_analyze(None, 1, machine)
+    elif stale:
+        fresh = run_analyze(stale, jobs, machine)
+
+    fresh_by_file = defaultdict(list)
+    for issue in fresh:
+        fresh_by_file[issue.file].append(issue)
+    stale = set(stale)
+
+    # Issues outside the import graph's Dart files (pubspec.yaml, analysis_options.yaml, ...)
+    # are only reported by a full run; they depend on the global inputs the cache is keyed by
+    if full_run:
+        other = [issue.to_dict() for issue in fresh if issue.file not in keys]
+    else:
+        other = cached_other
+    entries = {}
+    issues = [Issue.from_dict(data) for data in other]
+    for file, key in keys.items():
+        if file in stale:
+            file_issues = fresh_by_file[file]
+        else:
+            file_issues = [Issue.from_dict(data) for data in cached[file]["issues"]]
+        entries[file] = {"key": key, "issues": [issue.to_dict() for issue in file_issues]}
+        issues.extend(file_issues)
+
+    save_analyze_cache(global_hash, entries, other)
+    return issues
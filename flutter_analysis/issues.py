@@ -0,0 +1,64 @@
+"""
+Analyzer Issues
+The typed issue record shared by the parser, the renderers and the history
+store, and flutter analyze's canonical ordering of issues
+"""
+
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field, fields
+from typing import Dict, Iterable, List, Tuple
+
+# flutter analyze lists issues by file, position, then severity (errors first)
+SEVERITY_RANK = {"error": 0, "warning": 1, "info": 2}
+
+
+@dataclass(slots=True)
+class Issue:
+    """One diagnostic reported by the analyzer"""
+    level: str
+    message: str
+    # Project-relative POSIX path
+    file: str
+    line: int
+    col: int
+    rule: str
+    # Identity of the issue across runs, see flutter_analysis.diff
+    fingerprint: str = None
+    # Diagnostic type (lint, hint, static_warning, compile_time_error, ...); only machine output has it
+    type: str = field(default=None, compare=False)
+
+    def to_dict(self) -> Dict:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Issue":
+        """Issue from its to_dict() form; line and col may also be strings, as in older caches"""
+        issue = cls(**{f.name: data[f.name] for f in fields(cls) if f.name in data})
+        # Thousands of issues share a few hundred file names
+        issue.file = sys.intern(issue.file)
+        issue.line = int(issue.line)
+        issue.col = int(issue.col)
+        return issue
+
+
+def issue_sort_key(issue: Issue):
+    return (
+        issue.file,
+        issue.line,
+        issue.col,
+        SEVERITY_RANK.get(issue.level, len(SEVERITY_RANK)),
+        issue.message,
+    )
+
+
+def group_issues(issue_list: Iterable[Issue]) -> Tuple[Dict[str, List[Issue]], Dict[str, int]]:
+    """Group issues per file in flutter analyze's canonical order"""
+    issues = defaultdict(list)
+    counts = defaultdict(int)
+
+    for issue in sorted(issue_list, key=issue_sort_key):
+        issues[issue.file].append(issue)
+        counts[issue.level] += 1
+
+    return issues, counts
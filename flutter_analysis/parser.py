@@ -0,0 +1,94 @@
+"""
+Analyzer Output Parser
+Turns `flutter analyze` and `dart analyze --format=machine` output into
+Issue records, one line at a time
+"""
+
+import os
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Union
+
+from .issues import SEVERITY_RANK, Issue, group_issues
+
+# Human format: `  info • message • lib/file.dart:12:5 • rule_name`
+HUMAN_SEPARATOR = " • "
+# Machine format: `INFO|LINT|RULE_NAME|/abs/lib/file.dart|12|5|7|message`, with `\`, `|`
+# and newlines in fields escaped by a backslash
+MACHINE_PREFIXES = ("INFO|", "WARNING|", "ERROR|")
+MACHINE_FIELDS = 8
+
+
+@lru_cache(maxsize=4096)
+def normalize_issue_path(path: str):
+    """Project-relative POSIX path, whatever form the analyzer printed it in"""
+    if os.path.isabs(path):
+        relative = os.path.relpath(path)
+        if not relative.startswith(".."):
+            path = relative
+    return path.replace(os.sep, "/") if os.sep != "/" else path
+
+
+def split_machine_fields(line: str):
+    if "\\" not in line:
+        return line.split("|")
+    fields, field = [], []
+    chars = iter(line)
+    for char in chars:
+        if char == "\\":
+            escaped = next(chars, "")
+            field.append("\n" if escaped == "n" else escaped)
+        elif char == "|":
+            fields.append("".join(field))
+            field = []
+        else:
+            field.append(char)
+    fields.append("".join(field))
+    return fields
+
+
+def parse_issue_line(line: str) -> Optional[Issue]:
+    """Parse one line of human or machine analyzer output, or return None if it is not an issue.
+
+    Fields are split from the right, so messages may contain the separator
+    and paths may contain colons (e.g. Windows drive letters).
+    """
+    line = line.strip()
+    if line.startswith(MACHINE_PREFIXES):
+        fields = split_machine_fields(line)
+        if len(fields) != MACHINE_FIELDS:
+            return None
+        level, kind, rule, file, line_number, col, _, message = fields
+        if not (line_number.isdigit() and col.isdigit()):
+            return None
+        return Issue(
+            level.lower(), message, normalize_issue_path(file), int(line_number), int(col), rule.lower(),
+            type=kind.lower(),
+        )
+
+    level, separator, rest = line.partition(HUMAN_SEPARATOR)
+    if not separator or level not in SEVERITY_RANK:
+        return None
+    parts = rest.rsplit(HUMAN_SEPARATOR, 2)
+    if len(parts) != 3:
+        return None
+    message, location, rule = parts
+    file, _, position = location.rpartition(":")
+    file, _, line_number = file.rpartition(":")
+    if not (file and line_number.isdigit() and position.isdigit()):
+        return None
+    return Issue(level, message, normalize_issue_path(file), int(line_number), int(position), rule)
+
+
+def iter_issues(lines: Union[str, Iterable[str]]) -> Iterator[Issue]:
+    """Issues in analyzer output, given as a string or an iterable of lines, as they are parsed"""
+    if isinstance(lines, str):
+        lines = lines.splitlines()
+    return (issue for issue in map(parse_issue_line, lines) if issue)
+
+
+def parse_issues(lines: Union[str, Iterable[str]]) -> List[Issue]:
+    return list(iter_issues(lines))
+
+
+def parse_analyze_output(output: str):
+    return group_issues(parse_issues(output))
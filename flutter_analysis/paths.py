@@ -0,0 +1,14 @@
+"""
+Default Paths
+Where the analysis tooling keeps its reports, history and caches, relative to
+the project root. Kept free of heavy imports so the CLI can build its help
+text from them.
+"""
+
+import os
+
+REPORTS_DIR = 'reports'
+LATEST_REPORT = os.path.join(REPORTS_DIR, 'latest.md')
+DEFAULT_DATABASE = os.path.join(REPORTS_DIR, 'analyze_history.sqlite3')
+# Per-file analyze results for --incremental
+ANALYZE_CACHE = os.path.join('.dart_tool', 'flutter_report', 'analyze_cache.json')
@@ -0,0 +1,95 @@
+"""
+Report Renderers
+Turn a run's issues into a report document. Renderers are registered by
+format name, so tools can add their own next to markdown, JSON, JSON lines
+and SARIF. For reports too large to build in memory, use the streaming
+writers in flutter_analysis.writers.
+"""
+
+import io
+import json
+from typing import Callable, Dict, List
+
+from .issues import Issue, group_issues
+from .writers import WRITERS
+
+# format name -> function(issues, run_time) returning the document
+RENDERERS: Dict[str, Callable[[List[Issue], str], str]] = {}
+
+
+def renderer(name: str):
+    """Register the decorated function as the renderer for a format"""
+    def register(func):
+        RENDERERS[name] = func
+        return func
+    return register
+
+
+def render(name: str, issues: List[Issue], run_time: str) -> str:
+    try:
+        return RENDERERS[name](issues, run_time)
+    except KeyError:
+        raise ValueError(f"Unknown report format {name!r} (known: {', '.join(sorted(RENDERERS))})") from None
+
+
+def generate_markdown(issues: dict, counts: dict, run_time: str):
+    md = []
+    md.append(f"# Flutter Analyze Report — {run_time}\n")
+    md.append("> Generated automatically by script\n")
+
+    if not issues:
+        md.append("✅ No issues found!\n")
+        return "\n".join(md)
+
+    # summary
+    md.append("### Summary\n")
+    for level, count in counts.items():
+        md.append(f"- **{level.capitalize()}s**: {count}")
+    md.append("")
+
+    # details per file
+    for file, file_issues in issues.items():
+        md.append(f"## {file}\n")
+        for issue in file_issues:
+            md.append(
+                f"- **{issue.level.capitalize()}**: "
+                f"{issue.message}  \n"
+                f"  📍 Line {issue.line}, Col {issue.col}  "
+                f"(_Rule: `{issue.rule}`_)\n"
+            )
+        md.append("\n")
+
+    return "\n".join(md)
+
+
+@renderer("markdown")
+def render_markdown(issues: List[Issue], run_time: str) -> str:
+    return generate_markdown(*group_issues(issues), run_time)
+
+
+@renderer("json")
+def render_json(issues: List[Issue], run_time: str) -> str:
+    grouped, _ = group_issues(issues)
+    return json.dumps(
+        {"run_time": run_time, "issues": [issue.to_dict() for file_issues in grouped.values() for issue in file_issues]},
+        indent=1,
+    )
+
+
+def render_with_writer(name: str, issues: List[Issue]) -> str:
+    grouped, _ = group_issues(issues)
+    stream = io.StringIO()
+    with WRITERS[name](stream=stream) as writer:
+        for file_issues in grouped.values():
+            writer.write_all(file_issues)
+    return stream.getvalue()
+
+
+@renderer("jsonl")
+def render_jsonl(issues: List[Issue], run_time: str) -> str:
+    return render_with_writer("jsonl", issues)
+
+
+@renderer("sarif")
+def render_sarif(issues: List[Issue], run_time: str) -> str:
+    return render_with_writer("sarif", issues)
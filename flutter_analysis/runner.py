@@ -0,0 +1,120 @@
+"""
+Analyzer Runner
+Runs `flutter analyze` (or `dart analyze --format=machine`) over the project
+or a set of files, optionally split across concurrent analyzer processes
+"""
+
+import heapq
+import os
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, List
+
+from dart_import_graph import DEFAULT_ROOTS
+
+from .issues import Issue
+from .parser import parse_issue_line
+
+# Exit codes that mean the analyzer ran, whether or not it found issues
+ANALYZE_EXIT_CODES = {"flutter": (0, 1), "dart": (0, 1, 2, 3)}
+# Files other than Dart sources that a project-wide analyze reports issues in
+PROJECT_INPUT_FILES = ("pubspec.yaml", "analysis_options.yaml")
+
+
+def analyze_command(paths=None, machine: bool = False):
+    if machine:
+        return ["dart", "analyze", "--format=machine", *(paths or [])]
+    return ["flutter", "analyze", *(paths or [])]
+
+
+def run_flutter_analyze(paths=None, machine: bool = False) -> List[Issue]:
+    tool = " ".join(analyze_command(machine=machine))
+    if paths:
+        print(f"Running `{tool}` on {len(paths)} file(s) ...")
+    else:
+        print(f"Running `{tool}` ...")
+    return analyze_paths(paths, machine)
+
+
+def analyze_paths(paths=None, machine: bool = False) -> List[Issue]:
+    return list(iter_analyze(paths, machine))
+
+
+def iter_analyze(paths=None, machine: bool = False) -> Iterator[Issue]:
+    """Run the analyzer and yield issues as their lines arrive.
+
+    Raises RuntimeError once the output is exhausted if the analyzer itself failed.
+    """
+    cmd = analyze_command(paths, machine)
+    # Kept for the error message if the analyzer itself fails
+    other_lines = deque(maxlen=20)
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    ) as process:
+        for line in process.stdout:
+            issue = parse_issue_line(line)
+            if issue:
+                yield issue
+            elif line.strip():
+                other_lines.append(line.rstrip())
+    if process.returncode not in ANALYZE_EXIT_CODES[cmd[0]]:
+        raise RuntimeError(
+            f"{cmd[0]} analyze failed: " + "\n".join(other_lines)
+        )
+
+
+def project_dart_files():
+    """Dart files under the directories flutter analyze reports on"""
+    return sorted(
+        path.as_posix() for root in DEFAULT_ROOTS for path in Path(root).rglob("*.dart")
+    )
+
+
+def project_input_files():
+    """The non-Dart analyzer inputs present in the project"""
+    return [path for path in PROJECT_INPUT_FILES if os.path.isfile(path)]
+
+
+def chunk_paths(paths: list, jobs: int):
+    """Split paths into at most `jobs` chunks of similar total size, placing the largest files first"""
+    sizes = {path: max(os.path.getsize(path), 1) for path in paths}
+    chunks = [[] for _ in range(min(jobs, len(paths)))]
+    loads = [(0, index) for index in range(len(chunks))]
+    for path in sorted(paths, key=lambda p: (-sizes[p], p)):
+        load, index = heapq.heappop(loads)
+        chunks[index].append(path)
+        heapq.heappush(loads, (load + sizes[path], index))
+    return [sorted(chunk) for chunk in chunks]
+
+
+def run_parallel_analyze(paths: list, jobs: int, machine: bool = False, inputs=()) -> List[Issue]:
+    """Analyze path chunks in concurrent analyzer processes and join their issues.
+
+    Every worker still resolves the imports of its files, but only reports
+    issues in them, so together they find the same issues as one run.
+    Non-Dart `inputs` such as pubspec.yaml get a worker of their own.
+    """
+    chunks = chunk_paths(paths, jobs)
+    if inputs:
+        chunks.append(list(inputs))
+    tool = " ".join(analyze_command(machine=machine))
+    print(f"Running `{tool}` on {len(paths) + len(inputs)} file(s) in {len(chunks)} worker(s) ...")
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        results = list(pool.map(lambda chunk: analyze_paths(chunk, machine), chunks))
+    return [issue for issues in results for issue in issues]
+
+
+def run_analyze(paths=None, jobs: int = 1, machine: bool = False) -> List[Issue]:
+    """Issues found in the given paths (default: the whole project)"""
+    if jobs > 1:
+        if paths:
+            return run_parallel_analyze(paths, jobs, machine)
+        return run_parallel_analyze(project_dart_files(), jobs, machine, project_input_files())
+    return run_flutter_analyze(paths, machine)
@@ -0,0 +1,138 @@
+"""
+Issue Writers
+Machine-readable issue reports (JSON lines, SARIF 2.1.0) written one issue
+at a time, so a report of any size is produced in constant memory straight
+from the parser or the history database
+"""
+
+import json
+import sys
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, TextIO
+
+from .issues import Issue
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_LEVELS = {"error": "error", "warning": "warning", "info": "note"}
+# Key of the fingerprint in SARIF partialFingerprints; bump the version if flutter_analysis.diff changes the hash
+FINGERPRINT_KEY = "flutterAnalysis/v1"
+LINT_DOCS = "https://dart.dev/tools/linter-rules/"
+DIAGNOSTIC_DOCS = "https://dart.dev/tools/diagnostic-messages#"
+
+
+def rule_metadata(issue: Issue) -> Dict:
+    """SARIF reportingDescriptor for the rule of an issue.
+
+    Lints and compiler diagnostics are documented on different pages; which
+    one a rule belongs to is only known from machine output (--machine).
+    """
+    descriptor = {
+        "id": issue.rule,
+        "name": "".join(word.capitalize() for word in issue.rule.split("_")),
+        "shortDescription": {"text": issue.rule.replace("_", " ").capitalize()},
+        "defaultConfiguration": {"level": SARIF_LEVELS.get(issue.level, "none")},
+    }
+    if issue.type == "lint":
+        descriptor["helpUri"] = LINT_DOCS + issue.rule
+    elif issue.type:
+        descriptor["helpUri"] = DIAGNOSTIC_DOCS + issue.rule
+    if issue.type:
+        descriptor["properties"] = {"tags": [issue.type]}
+    return descriptor
+
+
+class IssueWriter(ABC):
+    """Base class for writers that receive issues one at a time.
+
+    Writes to `path` ("-" for stdout), or to an already open `stream`, which
+    is left open on close().
+    """
+
+    def __init__(self, path: str = "-", stream: TextIO = None):
+        self.path = path
+        self.issues = 0
+        if stream is not None:
+            self._file, self._owns_file = stream, False
+        elif path == "-":
+            self._file, self._owns_file = sys.stdout, False
+        else:
+            self._file, self._owns_file = open(path, "w", encoding="utf-8"), True
+
+    def __enter__(self) -> "IssueWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @abstractmethod
+    def write(self, issue: Issue):
+        """Write one issue"""
+
+    def write_all(self, issues: Iterable[Issue]) -> "IssueWriter":
+        for issue in issues:
+            self.write(issue)
+        return self
+
+    def close(self):
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+class JsonLinesWriter(IssueWriter):
+    """One JSON object per issue and line"""
+
+    def write(self, issue: Issue):
+        self.issues += 1
+        self._file.write(json.dumps(issue.to_dict(), ensure_ascii=False) + "\n")
+
+
+class SarifWriter(IssueWriter):
+    """SARIF 2.1.0 log with a single run.
+
+    Results are written as they arrive. The rules they reference are only
+    known at the end, so the tool object, whose key order in the run does
+    not matter, follows the results.
+    """
+
+    def __init__(self, path: str = "-", stream: TextIO = None, tool_name: str = "dart analyze"):
+        super().__init__(path, stream)
+        self.tool_name = tool_name
+        # rule id -> (index, descriptor), in order of first use
+        self.rules = {}
+        self._file.write(
+            f'{{"$schema": {json.dumps(SARIF_SCHEMA)}, "version": "2.1.0", "runs": [{{\n "results": ['
+        )
+
+    def write(self, issue: Issue):
+        rule = self.rules.get(issue.rule)
+        if rule is None:
+            rule = self.rules[issue.rule] = (len(self.rules), rule_metadata(issue))
+        result = {
+            "ruleId": issue.rule,
+            "ruleIndex": rule[0],
+            "level": SARIF_LEVELS.get(issue.level, "none"),
+            "message": {"text": issue.message},
+            "locations": [
+                {
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": issue.file, "uriBaseId": "%SRCROOT%"},
+                        "region": {"startLine": issue.line, "startColumn": issue.col},
+                    }
+                }
+            ],
+        }
+        if issue.fingerprint:
+            result["partialFingerprints"] = {FINGERPRINT_KEY: issue.fingerprint}
+        separator = ",\n  " if self.issues else "\n  "
+        self.issues += 1
+        self._file.write(separator + json.dumps(result, ensure_ascii=False))
+
+    def close(self):
+        tool = {"driver": {"name": self.tool_name, "rules": [descriptor for _, descriptor in self.rules.values()]}}
+        self._file.write(f'\n ],\n "tool": {json.dumps(tool, ensure_ascii=False)}\n}}]}}\n')
+        super().close()
+
+
+WRITERS = {"jsonl": JsonLinesWriter, "sarif": SarifWriter}
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Flutter Quality Pipeline
+Runs the analyzer, the format check and the tests as concurrent asyncio
+subprocess stages, parsing each stage's output as it streams, and writes one
+consolidated report with per-stage timings
+
+Usage: python flutter_quality.py [--serial] [--fail-on LEVEL] [-- flutter test args]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from flutter_analysis.issues import SEVERITY_RANK, Issue, group_issues
+from flutter_analysis.parser import parse_issue_line
+from flutter_analysis.runner import ANALYZE_EXIT_CODES, analyze_command
+from flutter_test_runner import Colors, FlutterTestRunner, uses_machine_reporter
+
+REPORT_FILE = os.path.join('reports', 'quality.md')
+# asyncio's default 64 KiB line limit is too small for machine reporter events carrying long stack traces
+LINE_LIMIT = 16 * 1024 * 1024
+# Output lines kept per stage for the report when it fails without anything parseable
+TAIL_LINES = 20
+
+
+@dataclass(slots=True)
+class StageResult:
+    """Outcome of one pipeline stage"""
+    name: str
+    command: List[str]
+    returncode: Optional[int] = None
+    # Wall-clock seconds from launch to exit
+    duration: float = 0.0
+    ok: bool = False
+    summary: str = ''
+    # Why the stage could not complete (tool missing, timeout), if it did not
+    error: str = None
+    tail: deque = field(default_factory=lambda: deque(maxlen=TAIL_LINES))
+
+
+class Stage:
+    """A command whose output lines are fed to a parser while it runs.
+
+    Subclasses parse in feed() and decide in finish() whether the stage
+    passed. Lines are fed on the event loop thread, so parsers need no locking.
+    """
+    name = 'stage'
+
+    def __init__(self, command: List[str]):
+        self.result = StageResult(self.name, command)
+
+    def feed(self, line: str, stream: str):
+        pass
+
+    def finish(self):
+        self.result.ok = self.result.returncode == 0
+
+
+class AnalyzeStage(Stage):
+    name = 'analyze'
+
+    def __init__(self, machine: bool = True, fail_on: str = 'info'):
+        super().__init__(analyze_command(machine=machine))
+        self.fail_on = fail_on
+        self.issues: List[Issue] = []
+
+    def feed(self, line: str, stream: str):
+        issue = parse_issue_line(line)
+        if issue:
+            self.issues.append(issue)
+        elif line.strip():
+            self.result.tail.append(line.rstrip())
+
+    def finish(self):
+        _, counts = group_issues(self.issues)
+        self.result.summary = ', '.join(
+            f"{counts.get(level, 0)} {level}(s)" for level in ('error', 'warning', 'info')
+        )
+        threshold = SEVERITY_RANK[self.fail_on]
+        failing = [issue for issue in self.issues if SEVERITY_RANK.get(issue.level, 0) <= threshold]
+        tool_ran = self.result.returncode in ANALYZE_EXIT_CODES[self.result.command[0]]
+        self.result.ok = tool_ran and not failing
+
+
+class FormatStage(Stage):
+    name = 'format'
+
+    def __init__(self, paths: List[str]):
+        super().__init__(['dart', 'format', '--output=none', '--set-exit-if-changed', *paths])
+        self.changed: List[str] = []
+
+    def feed(self, line: str, stream: str):
+        line = line.strip()
+        if line.startswith('Changed '):
+            self.changed.append(line[len('Changed '):])
+        elif line and not line.startswith('Formatted '):
+            self.result.tail.append(line)
+
+    def finish(self):
+        super().finish()
+        self.result.summary = f"{len(self.changed)} file(s) need formatting"
+
+
+class TestStage(Stage):
+    """flutter test with the machine reporter, parsed by FlutterTestRunner"""
+    name = 'test'
+
+    def __init__(self, additional_args: List[str]):
+        command = ['flutter', 'test', *additional_args]
+        if not uses_machine_reporter(command):
+            command.append('--machine')
+        super().__init__(command)
+        # Progress is not drawn: the other stages are printing too
+        self.runner = FlutterTestRunner(live=False, reporter='json')
+
+    def feed(self, line: str, stream: str):
+        self.runner.feed_line(line, stream)
+        if stream == 'stderr' and line.strip():
+            self.result.tail.append(line.rstrip())
+
+    def finish(self):
+        self.runner.finish_parsing()
+        self.runner.save_timings()
+        super().finish()
+        result = self.runner.result
+        self.result.summary = f"{result.passed} passed, {result.failed} failed, {result.skipped} skipped"
+
+
+async def _pump(reader: asyncio.StreamReader, stream: str, feed: Callable[[str, str], None]):
+    while True:
+        line = await reader.readline()
+        if not line:
+            return
+        feed(line.decode('utf-8', errors='replace'), stream)
+
+
+async def run_stage(stage: Stage, timeout: float) -> StageResult:
+    """Run a stage's command, feeding stdout and stderr to its parser as lines arrive"""
+    result = stage.result
+    started = time.monotonic()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *result.command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=LINE_LIMIT,
+        )
+    except FileNotFoundError:
+        result.error = f"`{result.command[0]}` not found"
+        result.duration = time.monotonic() - started
+        return result
+
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(
+                _pump(process.stdout, 'stdout', stage.feed),
+                _pump(process.stderr, 'stderr', stage.feed),
+                process.wait(),
+            ),
+            timeout,
+        )
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        result.error = f"timed out after {timeout:g}s"
+    result.returncode = process.returncode
+    result.duration = time.monotonic() - started
+    if result.error is None:
+        stage.finish()
+    return result
+
+
+def print_stage(result: StageResult):
+    if result.ok:
+        status = f"{Colors.GREEN}✅ {result.name:<8}{Colors.END}"
+    else:
+        status = f"{Colors.RED}❌ {result.name:<8}{Colors.END}"
+    print(f"{status} {result.duration:7.2f}s  {result.error or result.summary}")
+
+
+async def run_pipeline(stages: List[Stage], timeout: float, serial: bool = False) -> float:
+    """Run the stages, concurrently unless `serial`, printing each as it finishes; returns the wall-clock time"""
+    started = time.monotonic()
+    if serial:
+        for stage in stages:
+            print_stage(await run_stage(stage, timeout))
+    else:
+        for finished in asyncio.as_completed([run_stage(stage, timeout) for stage in stages]):
+            print_stage(await finished)
+    return time.monotonic() - started
+
+
+def generate_report(stages: Dict[str, Stage], wall_time: float) -> str:
+    md = [f"# Flutter Quality Report — {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"]
+    md.append("| Stage | Result | Time | Summary |")
+    md.append("|---|---|---:|---|")
+    for stage in stages.values():
+        result = stage.result
+        md.append(
+            f"| {result.name} | {'✅' if result.ok else '❌'} | {result.duration:.2f}s "
+            f"| {result.error or result.summary} |"
+        )
+    stage_time = sum(stage.result.duration for stage in stages.values())
+    md.append(f"\n**Wall clock**: {wall_time:.2f}s (stages took {stage_time:.2f}s in total)\n")
+
+    analyze = stages.get('analyze')
+    if analyze and analyze.issues:
+        md.append("## Analyzer issues\n")
+        issues, _ = group_issues(analyze.issues)
+        for file, file_issues in issues.items():
+            md.append(f"### {file}\n")
+            for issue in file_issues:
+                md.append(
+                    f"- **{issue.level.capitalize()}**: {issue.message}  \n"
+                    f"  📍 Line {issue.line}, Col {issue.col}  (_Rule: `{issue.rule}`_)"
+                )
+            md.append("")
+
+    format_stage = stages.get('format')
+    if format_stage and format_stage.changed:
+        md.append("## Files needing `dart format`\n")
+        md.extend(f"- {path}" for path in format_stage.changed)
+        md.append("")
+
+    test = stages.get('test')
+    if test and test.runner.result.failed_tests:
+        md.append("## Failed tests\n")
+        for case in test.runner.result.failed_tests:
+            md.append(f"- **{case.name}** ({case.file})")
+            for error in case.errors or ():
+                md.append(f"  - {error.message or error.type}")
+            if case.rerun_command:
+                md.append(f"  - Rerun: `{case.rerun_command}`")
+        md.append("")
+
+    for stage in stages.values():
+        result = stage.result
+        # Output the parsers did not understand, for stages that failed without explaining why
+        if not result.ok and result.tail and not (result.name == 'analyze' and analyze.issues):
+            md.append(f"## `{' '.join(result.command)}` output\n")
+            md.append("```")
+            md.extend(result.tail)
+            md.append("```\n")
+
+    return "\n".join(md)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run analyze, the format check and the tests concurrently and write one report. "
+                    "Unrecognized arguments are passed through to `flutter test`.",
+        allow_abbrev=False
+    )
+    parser.add_argument(
+        '--skip',
+        action='append',
+        choices=('analyze', 'format', 'test'),
+        default=[],
+        help="Leave out a stage (repeatable)"
+    )
+    parser.add_argument(
+        '--fail-on',
+        choices=tuple(SEVERITY_RANK),
+        default='info',
+        help="Lowest analyzer severity that fails the analyze stage (default: info, like flutter analyze)"
+    )
+    parser.add_argument(
+        '--flutter-analyze',
+        action='store_true',
+        help="Use `flutter analyze` instead of `dart analyze --format=machine`, which skips the Flutter tool's startup"
+    )
+    parser.add_argument(
+        '--format-paths',
+        nargs='+',
+        default=['.'],
+        metavar='PATH',
+        help="Paths checked by `dart format` (default: .)"
+    )
+    # Not --timeout, which is passed through to flutter test like its other flags
+    parser.add_argument(
+        '--stage-timeout',
+        type=int,
+        default=600,
+        metavar='SECONDS',
+        help="Timeout per stage in seconds (default: 600)"
+    )
+    parser.add_argument(
+        '--serial',
+        action='store_true',
+        help="Run the stages one after another, e.g. to compare against the concurrent wall-clock time"
+    )
+    parser.add_argument('--report', default=REPORT_FILE, metavar='PATH', help=f"Report file (default: {REPORT_FILE})")
+    options, test_args = parser.parse_known_args()
+
+    candidates = (
+        AnalyzeStage(machine=not options.flutter_analyze, fail_on=options.fail_on),
+        FormatStage(options.format_paths),
+        TestStage(test_args),
+    )
+    stages = {stage.name: stage for stage in candidates if stage.name not in options.skip}
+    if not stages:
+        parser.error("every stage was skipped")
+
+    print(f"{Colors.BOLD}{Colors.CYAN}🔍 Quality pipeline: {', '.join(stages)}"
+          f"{' (serial)' if options.serial else ''}{Colors.END}")
+    wall_time = asyncio.run(run_pipeline(list(stages.values()), options.stage_timeout, options.serial))
+
+    os.makedirs(os.path.dirname(options.report) or '.', exist_ok=True)
+    with open(options.report, 'w', encoding='utf-8') as f:
+        f.write(generate_report(stages, wall_time))
+
+    stage_time = sum(stage.result.duration for stage in stages.values())
+    print(f"\n⏱️  Wall clock {wall_time:.2f}s (stages took {stage_time:.2f}s in total)")
+    print(f"📝 Report: {options.report}")
+    sys.exit(0 if all(stage.result.ok for stage in stages.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -246,12 +246,36 @@ Flutter Test Runner with Clean Output
 Runs flutter tests and presents results in a readable format
 """
 
+import argparse
+import ctypes
+import ctypes.util
+import hashlib
+import heapq
+import os
+import select
+import struct
 import subprocess
 import re
 import sys
+import queue
+import threading
+import time
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 import json
+import math
+from dataclasses import dataclass, field, fields
+
+from dart_import_graph import DartImportGraph
+from test_result_writers import JUnitXmlWriter, JsonResultWriter
+
+# Runner state (timing history, caches) lives next to the Flutter tool's own build state
+STATE_DIR = os.path.join('.dart_tool', 'flutter_test_runner')
+TIMINGS_FILE = os.path.join(STATE_DIR, 'timings.json')
+FLAKINESS_FILE = os.path.join(STATE_DIR, 'flakiness.json')
+RESULTS_DIR = os.path.join(STATE_DIR, 'results')
+# Changes to these files can affect any test, whatever it imports
+GLOBAL_TEST_INPUTS = ('pubspec.yaml', 'pubspec.lock')
 
 class Colors:
     """ANSI color codes for terminal output"""
@@ -266,189 +290,1155 @@ class Colors:
     UNDERLINE = '\033[4m'
     END = '\033[0m'
 
+class TraceBuffer:
+    """Append-only UTF-8 store for the exception text of a whole run.
+    
+    Errors keep (start, end) byte offsets into one shared buffer instead of
+    each holding its own joined copy of the block plus a list of frame strings.
+    """
+    def __init__(self):
+        self._data = bytearray()
+    
+    def append(self, text: str) -> Tuple[int, int]:
+        start = len(self._data)
+        self._data += text.encode('utf-8')
+        return start, len(self._data)
+    
+    def read(self, start: int, end: int) -> str:
+        return self._data[start:end].decode('utf-8')
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+@dataclass(slots=True)
+class TestCase:
+    """A single test and its outcome"""
+    name: str
+    file: str
+    time: str = ''
+    status: str = 'RUNNING'
+    rerun_command: str = None
+    groups: Tuple[str, ...] = ()
+    start_ms: int = None
+    duration_ms: int = None
+    # Lines printed by the test; only kept for tests that did not pass
+    output: List[str] = None
+    # Whether the result was reused from the result cache instead of being run
+    cached: bool = False
+    # Exceptions attributed to this test
+    errors: List['TestError'] = None
+    # Isolated reruns made under --retry-failures; a passed test with retries is flaky
+    retries: int = 0
+    
+    def __post_init__(self):
+        # Thousands of tests share a few hundred file names
+        self.file = sys.intern(self.file)
+        self.groups = tuple(self.groups)
+    
+    def to_dict(self) -> Dict:
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        if self.errors:
+            data['errors'] = [error.to_dict() for error in self.errors]
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TestCase':
+        # Errors are not restored: their text lives in the trace buffer of the run that produced them
+        return cls(**{f.name: data[f.name] for f in fields(cls) if f.name in data and f.name != 'errors'})
+
+@dataclass(slots=True)
+class TestError:
+    """An exception block attributed to a test.
+    
+    The block's text lives in the run's TraceBuffer; full_stack and stack_trace
+    are rebuilt from offsets on access, which only happens when displaying it.
+    """
+    test: str
+    file: str
+    buffer: TraceBuffer = field(repr=False)
+    # Byte offsets of the joined exception block within the buffer
+    stack_span: Tuple[int, int] = (0, 0)
+    # Flattened (start, end) character offsets of each run of frames within full_stack
+    frame_spans: Tuple[int, ...] = ()
+    type: str = 'Unknown Error'
+    message: str = ''
+    full_message: str = ''
+    widget: str = ''
+    line_number: str = None
+    # Whether each of the first KEY_FRAMES frames points into test code
+    stack_highlights: Tuple[bool, ...] = ()
+    relevant_error_widget: str = ''
+    overflow_info: str = ''
+    exception_type: str = ''
+    
+    def __post_init__(self):
+        self.file = sys.intern(self.file)
+        self.type = sys.intern(self.type)
+    
+    @property
+    def full_stack(self) -> str:
+        return self.buffer.read(*self.stack_span)
+    
+    @property
+    def stack_trace(self) -> List[str]:
+        full_stack = self.full_stack
+        spans = self.frame_spans
+        frames = []
+        for i in range(0, len(spans), 2):
+            frames.extend(full_stack[spans[i]:spans[i + 1]].split('\n'))
+        return frames
+    
+    def to_dict(self) -> Dict:
+        data = {f.name: getattr(self, f.name) for f in fields(self)
+                if f.name not in ('buffer', 'stack_span', 'frame_spans')}
+        data['stack_trace'] = self.stack_trace
+        data['full_stack'] = self.full_stack
+        return data
+
 class TestResult:
     def __init__(self):
         self.passed = 0
         self.failed = 0
         self.skipped = 0
         self.total_time = ""
-        self.failed_tests = []
-        self.passed_tests = []
-        self.errors = []
+        self.failed_tests: List[TestCase] = []
+        self.passed_tests: List[TestCase] = []
+        self.errors: List[TestError] = []
+        # Shared storage for the text of every exception block in the run
+        self.traces = TraceBuffer()
+        # Populated by sharded runs: per-shard outcome and overall wall-clock seconds
+        self.shards = []
+        self.wall_time = None
+        # Elapsed milliseconds per test file, from its first testStart to its last testDone
+        self.file_durations = {}
+        self.skipped_by_file = {}
+        # Test files whose passing result was reused from the result cache
+        self.cached_files = []
+        # Machine reporter runs whose output reached the final 'done' event
+        self.done_events = 0
+        # Test files with a test that started but never reported testDone
+        self.unfinished_files = set()
+        # Whether every flutter test process ran to the end, failing (if at all) only because tests failed
+        self.completed = False
 
-class FlutterTestRunner:
+class StreamState:
+    """Parser state for a single output stream (stdout or stderr)"""
     def __init__(self):
+        self.current_test = None
+        self.in_exception = False
+        self.exception_lines = []
+        # Machine reporter (--reporter json) lookup tables, keyed by event ids
+        self.suites = {}
+        self.groups = {}
+        self.tests = {}
+        self.suite_started = {}
+        # Machine reporter: exception blocks still open in a test's print events, keyed by test id
+        self.test_exceptions = {}
+        # Compact reporter: when the previous progress line arrived, in ms since the runner started
+        self.last_progress_ms = None
+
+def format_elapsed(milliseconds: int) -> str:
+    """Format elapsed milliseconds the way the compact reporter does (MM:SS)"""
+    seconds = int(milliseconds // 1000)
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+def relative_test_path(path: str) -> str:
+    """Make an absolute suite path relative to the project when possible"""
+    if path.startswith('file://'):
+        path = path[len('file://'):]
+    if os.path.isabs(path):
+        relative = os.path.relpath(path)
+        if not relative.startswith('..'):
+            return relative
+    return path
+
+def uses_machine_reporter(args: List[str]) -> bool:
+    """Check whether flutter test arguments already select the JSON reporter"""
+    for i, arg in enumerate(args):
+        if arg in ('--machine', '--reporter=json', '-rjson'):
+            return True
+        if arg in ('-r', '--reporter') and i + 1 < len(args) and args[i + 1] == 'json':
+            return True
+    return False
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list, e.g. fraction=0.95 for p95"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+def split_test_args(args: List[str]) -> Tuple[List[str], List[str]]:
+    """Separate test file/directory targets from the other flutter test options"""
+    targets, options = [], []
+    for arg in args:
+        if not arg.startswith('-') and (arg.endswith('.dart') or os.path.isdir(arg)):
+            targets.append(arg)
+        else:
+            options.append(arg)
+    return targets, options
+
+def discover_test_files(targets: List[str] = None) -> List[str]:
+    """Expand test targets into a sorted list of *_test.dart files (default: test/)"""
+    files = set()
+    for target in targets or ['test']:
+        if os.path.isdir(target):
+            for root, _, names in os.walk(target):
+                files.update(
+                    os.path.join(root, name) for name in names if name.endswith('_test.dart')
+                )
+        elif target.endswith('.dart'):
+            files.add(target)
+    return sorted(files)
+
+class TimingStore:
+    """Per-file and per-test durations remembered between runs.
+    
+    Durations are smoothed with an exponential moving average so a single
+    slow or interrupted run does not throw off shard balancing. The last
+    SAMPLES raw durations are kept as well for percentiles in --profile.
+    """
+    SMOOTHING = 0.3
+    SAMPLES = 20
+    
+    def __init__(self, path: str = TIMINGS_FILE):
+        self.path = path
+        self.files = {}
+        self.tests = {}
+        # File and file::test keys whose newest sample was measured by this process
+        self._recorded = set()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.files = data.get('files', {})
+            self.tests = data.get('tests', {})
+        except (OSError, ValueError):
+            pass
+    
+    def file_duration(self, test_file: str) -> float:
+        """Expected duration of a test file in milliseconds, or None without history"""
+        entry = self.files.get(test_file)
+        return entry['duration_ms'] if entry else None
+    
+    def baseline(self, test_file: str, test_name: str = None) -> List[float]:
+        """Durations recorded by earlier runs for a file, or for one of its tests"""
+        table, key = (self.files, test_file) if test_name is None else (self.tests, f"{test_file}::{test_name}")
+        samples = table.get(key, {}).get('samples', [])
+        return samples[:-1] if key in self._recorded else samples
+    
+    def _update(self, table: Dict, key: str, duration_ms: float):
+        entry = table.get(key)
+        if entry is None:
+            entry = table[key] = {'duration_ms': duration_ms, 'runs': 1}
+        else:
+            entry['duration_ms'] += self.SMOOTHING * (duration_ms - entry['duration_ms'])
+            entry['runs'] += 1
+        entry['samples'] = (entry.get('samples', []) + [round(duration_ms)])[-self.SAMPLES:]
+        self._recorded.add(key)
+    
+    def record(self, result: TestResult):
+        """Fold the durations measured in a run into the history"""
+        for test_file, duration_ms in result.file_durations.items():
+            self._update(self.files, test_file, duration_ms)
+        for test in result.passed_tests + result.failed_tests:
+            # Cached results carry the duration of the run that stored them
+            if test.duration_ms is not None and not test.cached:
+                self._update(self.tests, f"{test.file}::{test.name}", test.duration_ms)
+    
+    def save(self):
+        """Write the history atomically so an interrupted run cannot corrupt it"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.files, 'tests': self.tests}, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+class FlakinessStore:
+    """Pass/fail history of each test across runs.
+    
+    Every run adds one outcome per test that actually ran: P (passed),
+    F (failed, retries included) or R (failed, then passed when retried).
+    Lifetime counts are kept next to the most recent HISTORY outcomes.
+    """
+    HISTORY = 50
+    OUTCOME_COUNTERS = {'P': 'passed', 'F': 'failed', 'R': 'flaky'}
+    
+    def __init__(self, path: str = FLAKINESS_FILE):
+        self.path = path
+        self.tests = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.tests = json.load(f).get('tests', {})
+        except (OSError, ValueError):
+            pass
+    
+    def record(self, result: TestResult):
+        """Add the outcome of every test that ran (not reused from the cache) to its history"""
+        now = datetime.now().isoformat(timespec='seconds')
+        for test in result.passed_tests + result.failed_tests:
+            if test.cached:
+                continue
+            outcome = 'F' if test.status == 'FAILED' else 'R' if test.retries else 'P'
+            entry = self.tests.setdefault(
+                f"{test.file}::{test.name}", {'passed': 0, 'failed': 0, 'flaky': 0, 'history': ''}
+            )
+            entry[self.OUTCOME_COUNTERS[outcome]] += 1
+            entry['history'] = (entry['history'] + outcome)[-self.HISTORY:]
+            entry['last_run'] = now
+            if outcome == 'R':
+                entry['last_flaky'] = now
+    
+    def history(self, test: TestCase) -> Dict:
+        return self.tests.get(f"{test.file}::{test.name}")
+    
+    def save(self):
+        """Write the history atomically so an interrupted run cannot corrupt it"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'tests': self.tests}, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+class ResultCache:
+    """Last outcome of each test file, keyed by a hash of everything it depends on.
+    
+    One small JSON file per key lives in the cache directory. Lookups touch
+    the file's mtime, so evicting the oldest mtimes first gives LRU eviction
+    once the directory grows past its size cap.
+    """
+    def __init__(self, directory: str = RESULTS_DIR, max_bytes: int = 20 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock_hash = None
+    
+    def key_for(self, test_file: str, graph: DartImportGraph, options: List[str]) -> str:
+        """Hash the test file's transitive Dart sources, pubspec.lock and the flutter test options"""
+        if self._lock_hash is None:
+            try:
+                with open('pubspec.lock', 'rb') as f:
+                    self._lock_hash = hashlib.sha256(f.read()).hexdigest()
+            except OSError:
+                self._lock_hash = ''
+        
+        inputs = graph.transitive_imports(test_file)
+        # flutter_test_config.dart files wrap every test in their directory tree
+        directory = os.path.dirname(os.path.normpath(test_file))
+        while directory:
+            inputs.add(os.path.join(directory, 'flutter_test_config.dart'))
+            directory = os.path.dirname(directory)
+        
+        digest = hashlib.sha256()
+        for path in sorted(inputs):
+            if path in graph.hashes:
+                digest.update(f"{path}\0{graph.hashes[path]}\n".encode('utf-8'))
+        digest.update(f"pubspec.lock\0{self._lock_hash}\n".encode('utf-8'))
+        digest.update('\0'.join(options).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def lookup(self, key: str) -> Dict:
+        """Return the stored entry for a key, marking it as recently used"""
+        path = os.path.join(self.directory, f"{key}.json")
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+            return entry
+        except (OSError, ValueError):
+            return None
+    
+    def store(self, key: str, entry: Dict):
+        """Write an entry atomically"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{key}.json")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(temp_path, path)
+    
+    def evict(self):
+        """Delete least recently used entries until the directory fits its size cap"""
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.json')]
+        except OSError:
+            return
+        stats = sorted(((entry.stat(), entry.path) for entry in entries), key=lambda item: item[0].st_mtime)
+        total = sum(stat.st_size for stat, _ in stats)
+        for stat, path in stats:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= stat.st_size
+
+def partition_by_duration(files: List[str], shards: int, timings: TimingStore) -> List[List[str]]:
+    """Assign test files to shards with longest-processing-time-first bin packing.
+    
+    Files are placed, longest first, onto the currently least loaded shard.
+    Files without history are estimated from their size, scaled by the
+    milliseconds per byte observed for files that do have history.
+    """
+    sizes = {test_file: max(os.path.getsize(test_file), 1) if os.path.exists(test_file) else 1
+             for test_file in files}
+    known = {test_file: timings.file_duration(test_file) for test_file in files}
+    known = {test_file: duration for test_file, duration in known.items() if duration is not None}
+    ms_per_byte = sum(known.values()) / sum(sizes[f] for f in known) if known else 1.0
+    estimates = {test_file: known.get(test_file, sizes[test_file] * ms_per_byte) for test_file in files}
+    
+    loads = [(0.0, index) for index in range(min(shards, len(files)))]
+    buckets = [[] for _ in loads]
+    for test_file in sorted(files, key=lambda f: (-estimates[f], f)):
+        load, index = heapq.heappop(loads)
+        buckets[index].append(test_file)
+        heapq.heappush(loads, (load + estimates[test_file], index))
+    return buckets
+
+def git_changed_files(ref: str) -> List[str]:
+    """Files changed since a git ref, including uncommitted and untracked ones"""
+    diff = subprocess.run(
+        # Without rename detection a renamed file is listed under its old path too,
+        # which is what the files still importing it depend on
+        ["git", "diff", "--name-only", "--no-renames", "--relative", ref, "--"],
+        capture_output=True, text=True, check=True
+    )
+    untracked = subprocess.run(
+        ["git", "ls-files", "--others", "--exclude-standard"],
+        capture_output=True, text=True, check=True
+    )
+    return sorted({
+        path.strip() for path in diff.stdout.splitlines() + untracked.stdout.splitlines() if path.strip()
+    })
+
+def select_affected_tests(ref: str, test_files: List[str]) -> List[str]:
+    """Narrow test files down to those importing (transitively) a Dart file changed since ref"""
+    changed = git_changed_files(ref)
+    # Dependency and test-harness configuration changes can affect every test
+    if any(path in GLOBAL_TEST_INPUTS or os.path.basename(path) == 'flutter_test_config.dart'
+           for path in changed):
+        return test_files
+    graph = DartImportGraph().build()
+    affected = graph.affected_by(path for path in changed if path.endswith('.dart'))
+    return [test_file for test_file in test_files if os.path.normpath(test_file) in affected]
+
+def _pump_lines(pipe, tag, sink: queue.Queue):
+    """Forward lines from a pipe into a queue, followed by a None sentinel"""
+    try:
+        for line in iter(pipe.readline, ''):
+            sink.put((tag, line))
+    finally:
+        pipe.close()
+        sink.put((tag, None))
+
+class FlutterTestRunner:
+    EXCEPTION_DELIMITER = '═══════════════════════════════════════════════'
+    PROGRESS_PATTERN = re.compile(r'(\d{2}:\d{2})\s+\+(\d+)\s+-(\d+):')
+    
+    REPORTERS = ('compact', 'json')
+    EXCEPTION_PREFIXES = ('Exception:', 'AssertionError:', 'RenderFlex')
+    DART_LINE_PATTERN = re.compile(r'\.dart:(\d+)')
+    FRAME_RUN_PATTERN = re.compile(r'#[^\n]*(?:\n(?:#|\.\.\.)[^\n]*)*')
+    # Line numbers in both '#0 main (file:///a_test.dart:12:3)' and terse 'a_test.dart 12:3  main' frames
+    FRAME_LINE_PATTERN = re.compile(r'\.dart[ :](\d+)')
+    ERROR_NAME_PATTERN = re.compile(r'\w*(?:Error|Exception)\b')
+    # The error event of a widget test whose exception block was already printed
+    LOGGED_FAILURE = 'Test failed. See exception logs above.'
+    # Stack frames shown (and highlighted) per error
+    KEY_FRAMES = 10
+    # --profile flags a test as regressed when it is this much slower than its history
+    REGRESSION_FACTOR = 1.5
+    REGRESSION_MIN_MS = 100
+    REGRESSION_MIN_RUNS = 3
+    
+    def __init__(self, timeout: int = 300, live: bool = True, reporter: str = 'compact'):
+        if reporter not in self.REPORTERS:
+            raise ValueError(f"Unsupported reporter: {reporter}")
         self.result = TestResult()
+        self.timeout = timeout
+        self.live = live and sys.stdout.isatty()
+        self.reporter = reporter
+        self.timings = TimingStore()
+        self.flakiness = FlakinessStore()
+        # With --retry-failures, failed tests are held back from listeners until retried
+        self.retry_failures = 0
+        self.result_cache = None
+        self._cache_keys = {}
+        # Objects with a test_finished(test) method, e.g. the JUnit XML and JSON writers
+        self.listeners = []
+        self._streams = {}
+        self._last_progress = None
+        self._clock_origin = time.monotonic()
     
     def run_tests(self, additional_args: List[str] = None) -> bool:
-        """Run flutter test command and capture output"""
+        """Run flutter test command and parse its output while it streams"""
         cmd = ["flutter", "test"]
         if additional_args:
             cmd.extend(additional_args)
+        if uses_machine_reporter(cmd):
+            self.reporter = 'json'
+        elif self.reporter == 'json':
+            cmd.append('--machine')
         
         print(f"{Colors.BLUE}🚀 Running Flutter Tests...{Colors.END}")
         print(f"{Colors.CYAN}Command: {' '.join(cmd)}{Colors.END}\n")
         
+        outcomes = self.run_guarded([cmd])
+        self.save_timings()
+        self.result.completed = self.ran_to_completion(outcomes)
+        return outcomes is not None and outcomes[0]['returncode'] == 0
+    
+    def run_sharded(self, shards: int, additional_args: List[str] = None) -> bool:
+        """Partition test files across concurrent flutter test processes and merge their results"""
+        targets, options = split_test_args(additional_args or [])
+        test_files = discover_test_files(targets)
+        if not test_files:
+            print(f"{Colors.RED}❌ No *_test.dart files found to run!{Colors.END}")
+            return False
+        partitions = partition_by_duration(test_files, shards, self.timings)
+        
+        # Shard output is merged from the machine reporter, whose counters are per test
+        self.reporter = 'json'
+        if not uses_machine_reporter(options):
+            options.append('--machine')
+        # Resolve packages once up front instead of racing a pub get in every worker
+        if '--no-pub' not in options:
+            outcomes = self.run_guarded([["flutter", "pub", "get"]])
+            if outcomes is None:
+                return False
+            if outcomes[0]['returncode'] != 0:
+                print(f"{Colors.RED}❌ flutter pub get failed with exit code {outcomes[0]['returncode']}, "
+                      f"not running the shards. Run it directly to see why.{Colors.END}")
+                return False
+            options.append('--no-pub')
+        
+        print(f"{Colors.BLUE}🚀 Running Flutter Tests in {len(partitions)} shards...{Colors.END}")
+        cmds = []
+        for index, files in enumerate(partitions):
+            cmds.append(["flutter", "test", *options, *files])
+            print(f"{Colors.CYAN}Shard {index + 1}: {len(files)} file(s){Colors.END}")
+        print()
+        
+        started = time.monotonic()
+        outcomes = self.run_guarded(cmds)
+        self.save_timings()
+        self.result.completed = self.ran_to_completion(outcomes)
+        if outcomes is None:
+            return False
+        self.result.wall_time = time.monotonic() - started
+        self.result.total_time = format_elapsed(self.result.wall_time * 1000)
+        self.result.shards = [
+            {'index': index, 'files': files, **outcome}
+            for index, (files, outcome) in enumerate(zip(partitions, outcomes))
+        ]
+        return all(outcome['returncode'] == 0 for outcome in outcomes)
+    
+    def ran_to_completion(self, outcomes: List[Dict]) -> bool:
+        """Whether no process timed out or aborted, so that its failed tests explain its exit code"""
+        if outcomes is None:
+            return False
+        if self.reporter == 'json' and self.result.done_events < len(outcomes):
+            return False
+        return all(
+            outcome['returncode'] == 0 or (outcome['returncode'] == 1 and self.result.failed_tests)
+            for outcome in outcomes
+        )
+    
+    def skip_cached_tests(self, test_files: List[str], options: List[str]) -> List[str]:
+        """Reuse stored results for test files whose inputs are unchanged since they last passed.
+        
+        Returns the test files that still have to run.
+        """
+        # Per-file outcomes need the machine reporter's test-to-file attribution
+        self.reporter = 'json'
+        graph = DartImportGraph().build()
+        self._cache_keys = {
+            os.path.normpath(test_file): self.result_cache.key_for(test_file, graph, options)
+            for test_file in test_files
+        }
+        remaining = []
+        for test_file in test_files:
+            entry = self.result_cache.lookup(self._cache_keys[os.path.normpath(test_file)])
+            if entry is None or entry.get('status') != 'PASSED':
+                remaining.append(test_file)
+                continue
+            for test in entry['passed_tests']:
+                # Retries belong to the run that recorded the entry; this run did not rerun anything
+                test = TestCase.from_dict({**test, 'cached': True, 'retries': 0})
+                self.result.passed_tests.append(test)
+                self.notify_test_finished(test)
+            self.result.passed += len(entry['passed_tests'])
+            self.result.skipped += entry.get('skipped', 0)
+            self.result.cached_files.append(test_file)
+        return remaining
+    
+    def update_result_cache(self):
+        """Record the outcome of every test file that ran to the end and trim the cache"""
+        if not self.result.completed:
+            # A timed out or aborted run may have stopped between two tests of a file
+            print(f"{Colors.YELLOW}⚠️  Run did not complete, result cache not updated{Colors.END}")
+            return
+        passed_by_file = {}
+        for test in self.result.passed_tests:
+            if not test.cached:
+                passed_by_file.setdefault(os.path.normpath(test.file), []).append(test.to_dict())
+        failed_files = {os.path.normpath(test.file) for test in self.result.failed_tests}
+        ran_files = {os.path.normpath(test_file) for test_file in self.result.file_durations}
+        
         try:
-            process = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minutes timeout
-            )
-            
-            self.parse_output(process.stdout, process.stderr)
-            return process.returncode == 0
+            for test_file, key in self._cache_keys.items():
+                if test_file not in ran_files or test_file in self.result.unfinished_files:
+                    continue
+                self.result_cache.store(key, {
+                    'file': test_file,
+                    'status': 'FAILED' if test_file in failed_files else 'PASSED',
+                    'passed_tests': passed_by_file.get(test_file, []),
+                    'skipped': self.result.skipped_by_file.get(test_file, 0),
+                    'recorded_at': datetime.now().isoformat(timespec='seconds')
+                })
+            self.result_cache.evict()
+        except OSError as e:
+            print(f"{Colors.YELLOW}⚠️  Could not update the result cache: {e}{Colors.END}")
+    
+    def retry_failed_tests(self, attempts: int, additional_args: List[str] = None, jobs: int = None) -> bool:
+        """Rerun each failed test on its own, in parallel, up to `attempts` times.
+        
+        A test that passes on a retry counts as passed and is reported as flaky;
+        its exceptions leave the error summary but stay attached to the test.
+        Returns whether every failure was recovered.
+        """
+        _, options = split_test_args(additional_args or [])
+        if not uses_machine_reporter(options):
+            options.append('--machine')
+        if '--no-pub' not in options:
+            options.append('--no-pub')
+        jobs = jobs or os.cpu_count() or 1
+        
+        retried = list(self.result.failed_tests)
+        pending = retried
+        for attempt in range(1, attempts + 1):
+            if not pending:
+                break
+            print(f"{Colors.BLUE}🔁 Retrying {len(pending)} failed test(s) in isolation "
+                  f"(attempt {attempt}/{attempts})...{Colors.END}")
+            retry = FlutterTestRunner(timeout=self.timeout, live=False, reporter='json')
+            for start in range(0, len(pending), jobs):
+                cmds = [
+                    ["flutter", "test", *options, test.file, "--plain-name", test.name]
+                    for test in pending[start:start + jobs]
+                ]
+                if retry.run_guarded(cmds) is None:
+                    break
             
+            # --plain-name matches substrings, so only a pass of the exact same test counts
+            passed = {
+                (os.path.normpath(relative_test_path(test.file)), test.name) for test in retry.result.passed_tests
+            }
+            still_failing = []
+            for test in pending:
+                test.retries += 1
+                if (os.path.normpath(relative_test_path(test.file)), test.name) in passed:
+                    self._mark_flaky(test)
+                else:
+                    still_failing.append(test)
+            pending = still_failing
+        
+        for test in retried:
+            self.notify_test_finished(test)
+        return not self.result.failed_tests
+    
+    def _mark_flaky(self, test: TestCase):
+        test.status = 'PASSED'
+        self.result.failed_tests.remove(test)
+        self.result.passed_tests.append(test)
+        self.result.failed = max(self.result.failed - 1, 0)
+        self.result.passed += 1
+        if test.errors:
+            recovered = {id(error) for error in test.errors}
+            self.result.errors = [error for error in self.result.errors if id(error) not in recovered]
+    
+    def save_flakiness(self):
+        """Add this run's outcomes to the per-test pass/fail history"""
+        self.flakiness.record(self.result)
+        try:
+            self.flakiness.save()
+        except OSError as e:
+            print(f"{Colors.YELLOW}⚠️  Could not save flakiness history: {e}{Colors.END}")
+    
+    def notify_test_finished(self, test: TestCase):
+        """Hand a test whose outcome is final to every listener"""
+        if self.retry_failures and test.status == 'FAILED' and not test.retries:
+            return
+        for listener in self.listeners:
+            listener.test_finished(test)
+    
+    def save_timings(self):
+        """Persist the durations measured in this run for shard balancing and profiling"""
+        if not self.result.file_durations and not any(
+            test.duration_ms is not None for test in self.result.passed_tests + self.result.failed_tests
+        ):
+            return
+        self.timings.record(self.result)
+        try:
+            self.timings.save()
+        except OSError as e:
+            print(f"{Colors.YELLOW}⚠️  Could not save test timings: {e}{Colors.END}")
+    
+    def run_guarded(self, cmds: List[List[str]]) -> List[Dict]:
+        """Stream the given commands, reporting failures to launch or finish them"""
+        try:
+            return self.stream_processes(cmds)
+        
         except subprocess.TimeoutExpired:
             print(f"{Colors.RED}❌ Test execution timed out!{Colors.END}")
-            return False
+            return None
         except FileNotFoundError:
             print(f"{Colors.RED}❌ Flutter command not found! Make sure Flutter is installed.{Colors.END}")
-            return False
+            return None
         except Exception as e:
             print(f"{Colors.RED}❌ Error running tests: {e}{Colors.END}")
-            return False
+            return None
     
-    def parse_output(self, stdout: str, stderr: str):
-        """Parse flutter test output and extract meaningful information"""
-        lines = stdout.split('\n') + stderr.split('\n')
-        
-        current_test = None
-        in_exception = False
-        exception_lines = []
+    def stream_process(self, cmd: List[str]) -> int:
+        """Run a command and feed stdout/stderr lines to the parser as they arrive"""
+        return self.stream_processes([cmd])[0]['returncode']
+    
+    def stream_processes(self, cmds: List[List[str]]) -> List[Dict]:
+        """Run commands concurrently and feed their output to the parser as it arrives.
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Extract test results (e.g., "00:04 +173 -30:")
-            result_match = re.match(r'(\d{2}:\d{2})\s+\+(\d+)\s+-(\d+):', line)
-            if result_match:
-                self.result.total_time = result_match.group(1)
-                self.result.passed = int(result_match.group(2))
-                self.result.failed = int(result_match.group(3))
-            
-            # Extract individual test results
-            if ': ' in line and ('PASS' in line or 'FAIL' in line or '[E]' in line):
-                test_info = self.extract_test_info(line)
-                if test_info:
-                    current_test = test_info
-                    if '[E]' in line or 'FAIL' in line:
-                        self.result.failed_tests.append(test_info)
-                    else:
-                        self.result.passed_tests.append(test_info)
+        Every pipe is drained by a reader thread into one queue so no child can
+        fill up its pipe and block, while parsing stays on this thread. Each
+        stream keeps its own parser state, so interleaved lines never mix.
+        Returns the exit code and wall-clock duration of every command.
+        """
+        lines = queue.Queue()
+        processes = []
+        readers = []
+        try:
+            for index, cmd in enumerate(cmds):
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    errors='replace',
+                    bufsize=1
+                )
+                processes.append(process)
+                for name, pipe in (('stdout', process.stdout), ('stderr', process.stderr)):
+                    reader = threading.Thread(
+                        target=_pump_lines, args=(pipe, (index, name), lines), daemon=True
+                    )
+                    reader.start()
+                    readers.append(reader)
             
-            # Extract exceptions
-            if '═══════════════════════════════════════════════' in line:
-                if in_exception:
-                    # End of exception, process it
-                    self.process_exception(exception_lines, current_test)
-                    exception_lines = []
-                in_exception = not in_exception
-            elif in_exception:
-                exception_lines.append(line)
+            started = time.monotonic()
+            deadline = started + self.timeout
+            open_streams = [2] * len(processes)
+            finished = [None] * len(processes)
+            while any(open_streams):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(cmds[0], self.timeout)
+                try:
+                    (index, name), line = lines.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+                if line is None:
+                    open_streams[index] -= 1
+                    if not open_streams[index]:
+                        finished[index] = time.monotonic()
+                    continue
+                self.feed_line(line, f'{index}:{name}')
             
-            # Extract "To run this test again" commands
-            if line.startswith('To run this test again:'):
-                if current_test:
-                    current_test['rerun_command'] = line.replace('To run this test again: ', '')
+            return [
+                {
+                    'returncode': process.wait(timeout=max(deadline - time.monotonic(), 0)),
+                    'duration': finished[index] - started
+                }
+                for index, process in enumerate(processes)
+            ]
+        except BaseException:
+            for process in processes:
+                process.kill()
+                process.wait()
+            raise
+        finally:
+            self.finish_parsing()
     
-    def extract_test_info(self, line: str) -> Dict:
+    def parse_output(self, stdout: str, stderr: str):
+        """Parse fully buffered flutter test output"""
+        for line in stdout.split('\n'):
+            self.feed_line(line, 'stdout')
+        for line in stderr.split('\n'):
+            self.feed_line(line, 'stderr')
+        self.finish_parsing()
+    
+    def feed_line(self, line: str, stream: str = 'stdout'):
+        """Incrementally parse a single line of flutter test output"""
+        line = line.strip()
+        if not line:
+            return
+        
+        state = self._streams.get(stream)
+        if state is None:
+            state = self._streams[stream] = StreamState()
+        
+        if self.reporter == 'json':
+            # Anything that is not a JSON event (tool banners, stray prints) is ignored
+            if line[0] == '{':
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    return
+                self.feed_event(event, state)
+            return
+        
+        # Extract test results (e.g., "00:04 +173 -30:")
+        result_match = self.PROGRESS_PATTERN.match(line)
+        if result_match:
+            self.result.total_time = result_match.group(1)
+            self.result.passed = int(result_match.group(2))
+            self.result.failed = int(result_match.group(3))
+            self.report_progress()
+        now_ms = int((time.monotonic() - self._clock_origin) * 1000)
+        
+        # Extract individual test results
+        if ': ' in line and ('PASS' in line or 'FAIL' in line or '[E]' in line):
+            test_info = self.extract_test_info(line)
+            if test_info:
+                # Without per-test events, a test is taken to run from the previous progress line to its own
+                test_info.start_ms = state.last_progress_ms if state.last_progress_ms is not None else now_ms
+                test_info.duration_ms = now_ms - test_info.start_ms
+                # Exceptions and the rerun command are printed after the test's own line,
+                # so a test is only final once the next one starts
+                if state.current_test is not None:
+                    self.notify_test_finished(state.current_test)
+                state.current_test = test_info
+                if '[E]' in line or 'FAIL' in line:
+                    self.result.failed_tests.append(test_info)
+                else:
+                    self.result.passed_tests.append(test_info)
+        if result_match:
+            state.last_progress_ms = now_ms
+        
+        # Extract exceptions, holding only the lines of the current block
+        block = self.feed_exception_line(state.exception_lines if state.in_exception else None,
+                                         line, state.current_test)
+        state.in_exception = block is not None
+        state.exception_lines = block if block is not None else []
+        
+        # Extract "To run this test again" commands
+        if line.startswith('To run this test again:'):
+            if state.current_test:
+                state.current_test.rerun_command = line.replace('To run this test again: ', '')
+    
+    def feed_exception_line(self, block: Optional[List[str]], line: str, current_test: TestCase) -> Optional[List[str]]:
+        """Advance the exception block state machine by one stripped line.
+        
+        `block` holds the lines of the open block, or is None outside of one;
+        the new value is returned. A closed block is processed for `current_test`.
+        """
+        if self.EXCEPTION_DELIMITER in line:
+            if block is not None:
+                self.process_exception(block, current_test)
+                return None
+            # The opening rule names the origin, e.g. "══╡ EXCEPTION CAUGHT BY WIDGETS LIBRARY ╞══"
+            return [line] if 'EXCEPTION CAUGHT BY' in line else []
+        if block is not None:
+            block.append(line)
+        return block
+    
+    def feed_event(self, event: Dict, state: StreamState):
+        """Apply a single machine reporter event to the test result"""
+        event_type = event.get('type')
+        
+        if event_type == 'testStart':
+            test = event['test']
+            suite_path = state.suites.get(test.get('suiteID'), '')
+            groups = [state.groups[g] for g in test.get('groupIDs', []) if state.groups.get(g)]
+            test_info = state.tests[test['id']] = TestCase(
+                name=test['name'],
+                file=suite_path or relative_test_path(test.get('url') or 'Unknown File'),
+                time=format_elapsed(event.get('time', 0)),
+                groups=groups,
+                start_ms=event.get('time', 0)
+            )
+            state.suite_started.setdefault(test_info.file, event.get('time', 0))
+        
+        elif event_type == 'testDone':
+            test_info = state.tests.pop(event['testID'], None)
+            if test_info is None:
+                return
+            block = state.test_exceptions.pop(event['testID'], None)
+            if block:
+                self.process_exception(block, test_info)
+            self.result.total_time = format_elapsed(event.get('time', 0))
+            self.result.file_durations[test_info.file] = (
+                event.get('time', 0) - state.suite_started.get(test_info.file, test_info.start_ms)
+            )
+            outcome = event.get('result')
+            # Hidden entries are the synthetic "loading <file>" tests; only surface them when they fail
+            if event.get('hidden') and outcome == 'success':
+                return
+            test_info.duration_ms = event.get('time', 0) - test_info.start_ms
+            if event.get('skipped'):
+                test_info.status = 'SKIPPED'
+                self.result.skipped += 1
+                skipped_file = os.path.normpath(test_info.file)
+                self.result.skipped_by_file[skipped_file] = self.result.skipped_by_file.get(skipped_file, 0) + 1
+            elif outcome == 'success':
+                test_info.status = 'PASSED'
+                test_info.output = None
+                self.result.passed += 1
+                self.result.passed_tests.append(test_info)
+            else:
+                test_info.status = 'FAILED'
+                test_info.rerun_command = f'flutter test {test_info.file} --plain-name "{test_info.name}"'
+                self.result.failed += 1
+                self.result.failed_tests.append(test_info)
+            self.notify_test_finished(test_info)
+            self.report_progress()
+        
+        elif event_type == 'error':
+            test_info = state.tests.get(event.get('testID'))
+            error_text = event.get('error', '').strip()
+            if error_text.startswith(self.LOGGED_FAILURE) and test_info is not None and test_info.errors:
+                return
+            self.process_error_event(error_text, event.get('stackTrace', ''), event.get('isFailure', False), test_info)
+        
+        elif event_type == 'print':
+            test_id = event.get('testID')
+            test_info = state.tests.get(test_id)
+            if test_info is not None:
+                message = event.get('message', '')
+                if test_info.output is None:
+                    test_info.output = []
+                test_info.output.append(message)
+                # Widget test exceptions are printed as the same delimited blocks the compact reporter shows
+                block = state.test_exceptions.pop(test_id, None)
+                for line in message.splitlines():
+                    line = line.strip()
+                    if line:
+                        block = self.feed_exception_line(block, line, test_info)
+                if block is not None:
+                    state.test_exceptions[test_id] = block
+        
+        elif event_type == 'suite':
+            suite = event['suite']
+            state.suites[suite['id']] = relative_test_path(suite.get('path') or '')
+        
+        elif event_type == 'group':
+            group = event['group']
+            state.groups[group['id']] = group.get('name') or ''
+        
+        elif event_type == 'done':
+            self.result.done_events += 1
+            self.result.total_time = format_elapsed(event.get('time', 0))
+            self.result.unfinished_files.update(os.path.normpath(test.file) for test in state.tests.values())
+            state.tests.clear()
+    
+    def finish_parsing(self):
+        """Flush exception blocks left open at end of output and reset stream state"""
+        for state in self._streams.values():
+            self.result.unfinished_files.update(os.path.normpath(test.file) for test in state.tests.values())
+            if state.in_exception and state.exception_lines:
+                self.process_exception(state.exception_lines, state.current_test)
+            for test_id, block in state.test_exceptions.items():
+                if block:
+                    self.process_exception(block, state.tests.get(test_id))
+            if state.current_test is not None:
+                self.notify_test_finished(state.current_test)
+        self._streams = {}
+        if self._last_progress is not None:
+            self._last_progress = None
+            if self.live:
+                print()
+    
+    def report_progress(self):
+        """Show the running pass/fail counters on a single terminal line"""
+        progress = (self.result.total_time, self.result.passed, self.result.failed)
+        if progress == self._last_progress:
+            return
+        self._last_progress = progress
+        if self.live:
+            sys.stdout.write(
+                f"\r  ⏳ {Colors.CYAN}{progress[0]}{Colors.END}  "
+                f"✅ {Colors.GREEN}{progress[1]}{Colors.END}  "
+                f"❌ {Colors.RED}{progress[2]}{Colors.END}"
+            )
+            sys.stdout.flush()
+    
+    def extract_test_info(self, line: str) -> TestCase:
         """Extract test information from a result line"""
         # Pattern for test results like: "00:04 +173 -30: /path/to/test.dart: Test Name [E]"
         pattern = r'(\d{2}:\d{2})\s+[+\-\d\s:]+([^:]+\.dart):\s*(.+?)(?:\s+\[E\])?$'
         match = re.match(pattern, line)
         
         if match:
-            return {
-                'time': match.group(1),
-                'file': match.group(2).strip(),
-                'name': match.group(3).strip(),
-                'status': 'FAILED' if '[E]' in line else 'PASSED',
-                'rerun_command': None
-            }
+            return TestCase(
+                name=match.group(3).strip(),
+                file=match.group(2).strip(),
+                time=match.group(1),
+                status='FAILED' if '[E]' in line else 'PASSED'
+            )
         return None
     
-    def process_exception(self, exception_lines: List[str], current_test: Dict):
-        """Process and clean up exception information"""
+    def process_exception(self, exception_lines: List[str], current_test: TestCase):
+        """Classify an exception block in a single pass over its lines.
+        
+        A run of stack frames is consumed with one precompiled match against the
+        joined block instead of line by line, and the first '.dart:<line>'
+        reference is picked up along the way instead of in a second pass.
+        Frames are recorded as offsets into the block, which is stored once in
+        the run's trace buffer.
+        """
         if not exception_lines:
             return
         
-        error_info = {
-            'test': current_test['name'] if current_test else 'Unknown Test',
-            'file': current_test['file'] if current_test else 'Unknown File',
-            'type': 'Unknown Error',
-            'message': '',
-            'full_message': '',
-            'widget': '',
-            'line_number': None,
-            'stack_trace': [],
-            'relevant_error_widget': '',
-            'overflow_info': '',
-            'exception_type': '',
-            'full_stack': '\n'.join(exception_lines)
-        }
+        test_file = current_test.file if current_test else 'Unknown File'
+        test_basename = test_file.rsplit('/', 1)[-1]
+        full_stack = '\n'.join(exception_lines)
+        error = TestError(
+            test=current_test.name if current_test else 'Unknown Test',
+            file=test_file,
+            buffer=self.result.traces
+        )
+        frame_spans = []
+        key_frames = []
         
-        # Extract error type and detailed information
-        in_stack_trace = False
+        full_msg_lines = None
+        full_msg_budget = 0
+        expect_relevant_widget = False
+        line_number = None
         
-        for i, line in enumerate(exception_lines):
-            # Extract exception header
-            if 'EXCEPTION CAUGHT BY' in line:
-                error_info['type'] = line.replace('EXCEPTION CAUGHT BY', '').replace('╞', '').strip()
+        count = len(exception_lines)
+        i = 0
+        offset = 0
+        while i < count:
+            line = exception_lines[i]
             
-            # Extract main error message
-            elif line.startswith('The following'):
-                error_info['message'] = line
-                # Get next few lines for full message
-                full_msg_lines = [line]
-                for j in range(i+1, min(i+5, len(exception_lines))):
-                    if exception_lines[j] and not exception_lines[j].startswith('The relevant'):
-                        full_msg_lines.append(exception_lines[j])
-                    else:
-                        break
-                error_info['full_message'] = '\n'.join(full_msg_lines)
-            
-            # Extract widget causing error
-            elif 'error-causing widget was:' in line:
-                widget_match = re.search(r'widget was:\s*(.+)', line)
-                if widget_match:
-                    error_info['widget'] = widget_match.group(1).strip()
+            if line[0] == '#' and '(' in line and ')' in line:
+                # Frames run until the first line not starting with '#' or '...'
+                run = self.FRAME_RUN_PATTERN.match(full_stack, offset)
+                frames = run.group().split('\n')
+                frame_spans.extend(run.span())
+                if len(key_frames) < self.KEY_FRAMES:
+                    key_frames.extend(frames[:self.KEY_FRAMES - len(key_frames)])
+                if line_number is None:
+                    line_match = self.DART_LINE_PATTERN.search(full_stack, offset, run.end())
+                    if line_match:
+                        line_number = line_match.group(1)
+                if full_msg_budget:
+                    full_msg_lines.extend(frames[:full_msg_budget])
+                    full_msg_budget = max(full_msg_budget - len(frames), 0)
+                if expect_relevant_widget:
+                    error.relevant_error_widget = frames[0]
+                    expect_relevant_widget = False
+                i += len(frames)
+                offset = run.end() + 1
+                continue
+            i += 1
+            offset += len(line) + 1
             
-            # Extract relevant error-causing widget
-            elif 'The relevant error-causing widget was:' in line:
-                if i+1 < len(exception_lines):
-                    error_info['relevant_error_widget'] = exception_lines[i+1].strip()
+            if line_number is None and '.dart:' in line:
+                line_match = self.DART_LINE_PATTERN.search(line)
+                if line_match:
+                    line_number = line_match.group(1)
             
-            # Extract overflow information
-            elif 'overflowed by' in line:
-                error_info['overflow_info'] = line.strip()
+            # Keep collecting the lines that follow "The following ..." into the full message
+            if full_msg_budget:
+                if line.startswith('The relevant'):
+                    full_msg_budget = 0
+                else:
+                    full_msg_lines.append(line)
+                    full_msg_budget -= 1
             
-            # Extract exception type (like Exception, AssertionError, etc.)
-            elif line.startswith('Exception:') or line.startswith('AssertionError:') or line.startswith('RenderFlex'):
-                error_info['exception_type'] = line.strip()
+            if expect_relevant_widget:
+                error.relevant_error_widget = line
+                expect_relevant_widget = False
             
-            # Extract stack trace
-            elif line.startswith('#') and ('(' in line and ')' in line):
-                in_stack_trace = True
-                error_info['stack_trace'].append(line.strip())
-            elif in_stack_trace and line.strip():
-                if not line.startswith('#') and not line.startswith('...'):
-                    in_stack_trace = False
-                else:
-                    error_info['stack_trace'].append(line.strip())
+            if 'EXCEPTION CAUGHT BY' in line:
+                error.type = sys.intern(line.partition('EXCEPTION CAUGHT BY')[2].strip('═╡╞ '))
+            elif line.startswith('The following'):
+                error.message = line
+                full_msg_lines = [line]
+                full_msg_budget = 4
+            elif 'error-causing widget was:' in line:
+                widget = line.partition('widget was:')[2].strip()
+                if line.startswith('The relevant'):
+                    # The widget usually follows on the next line
+                    if widget:
+                        error.relevant_error_widget = widget
+                    else:
+                        expect_relevant_widget = True
+                if widget:
+                    error.widget = widget
+            elif 'overflowed by' in line:
+                error.overflow_info = line
+            elif line.startswith(self.EXCEPTION_PREFIXES):
+                error.exception_type = line
+        
+        error.stack_highlights = tuple(
+            '.dart:' in frame and ('test' in frame or test_basename in frame)
+            for frame in key_frames
+        )
+        if full_msg_lines:
+            error.full_message = '\n'.join(full_msg_lines)
+        error.line_number = line_number
+        error.stack_span = self.result.traces.append(full_stack)
+        error.frame_spans = tuple(frame_spans)
+        self.record_error(error, current_test)
+    
+    def process_error_event(self, error_text: str, stack_trace: str, is_failure: bool, current_test: TestCase):
+        """Classify the error of a machine reporter error event.
+        
+        The first line of the error is its message and the rest its body. The
+        stack trace comes as the test package formats it, usually terse frames
+        like 'package:x/y.dart 12:3  main', so every line of it is a frame.
+        """
+        message, _, body = error_text.partition('\n')
+        lines = [message.strip()] if message.strip() else []
+        lines.extend(line.strip() for line in body.splitlines() if line.strip())
+        frames = [line.strip() for line in stack_trace.splitlines() if line.strip()]
+        if not lines and not frames:
+            return
         
-        # Extract line number from stack trace or file paths
-        for line in exception_lines:
-            if '.dart:' in line:
-                line_match = re.search(r'\.dart:(\d+)', line)
+        test_file = current_test.file if current_test else 'Unknown File'
+        test_basename = test_file.rsplit('/', 1)[-1]
+        full_stack = '\n'.join(lines + frames)
+        error = TestError(
+            test=current_test.name if current_test else 'Unknown Test',
+            file=test_file,
+            buffer=self.result.traces
+        )
+        error.message = lines[0] if lines else ''
+        if len(lines) > 1:
+            error.full_message = '\n'.join(lines)
+        name_match = self.ERROR_NAME_PATTERN.match(error.message)
+        if is_failure:
+            # expect() failures; their first line is usually "Expected: ..."
+            error.type = 'Test failure'
+        elif name_match:
+            error.type = sys.intern(name_match.group())
+            error.exception_type = error.message
+        else:
+            error.type = 'Uncaught error'
+        
+        if frames:
+            key_frames = frames[:self.KEY_FRAMES]
+            error.stack_highlights = tuple(test_basename in frame for frame in key_frames)
+            # Prefer the first frame in the test file itself over framework frames
+            for frame in sorted(frames, key=lambda frame: test_basename not in frame):
+                line_match = self.FRAME_LINE_PATTERN.search(frame)
                 if line_match:
-                    error_info['line_number'] = line_match.group(1)
+                    error.line_number = line_match.group(1)
                     break
-        
-        self.result.errors.append(error_info)
+            error.frame_spans = (len(full_stack) - len('\n'.join(frames)), len(full_stack))
+        error.stack_span = self.result.traces.append(full_stack)
+        self.record_error(error, current_test)
+    
+    def record_error(self, error: TestError, current_test: TestCase):
+        """Attach a classified error to the run and to the test it belongs to"""
+        self.result.errors.append(error)
+        if current_test is not None:
+            if current_test.errors is None:
+                current_test.errors = []
+            current_test.errors.append(error)
     
     def display_results(self):
         """Display test results in a clean, readable format"""
@@ -465,30 +1455,70 @@ class FlutterTestRunner:
         print(f"  📊 Total Tests: {Colors.BLUE}{total_tests}{Colors.END}")
         print(f"  ✅ Passed: {Colors.GREEN}{self.result.passed}{Colors.END}")
         print(f"  ❌ Failed: {Colors.RED}{self.result.failed}{Colors.END}")
+        if self.result.skipped:
+            print(f"  ⏭️  Skipped: {Colors.YELLOW}{self.result.skipped}{Colors.END}")
+        flaky_tests = [test for test in self.result.passed_tests if test.retries]
+        if flaky_tests:
+            print(f"  🎲 Flaky: {Colors.YELLOW}{len(flaky_tests)} (passed on retry){Colors.END}")
+        if self.result.cached_files:
+            print(f"  ♻️  Cached: {Colors.CYAN}{len(self.result.cached_files)} file(s) unchanged since they last passed{Colors.END}")
         print(f"  📊 Success Rate: {Colors.GREEN if success_rate >= 80 else Colors.YELLOW if success_rate >= 60 else Colors.RED}{success_rate:.1f}%{Colors.END}")
         
+        if self.result.shards:
+            serial_time = sum(shard['duration'] for shard in self.result.shards)
+            speedup = serial_time / self.result.wall_time if self.result.wall_time else 0
+            print(f"\n{Colors.BOLD}⚡ SHARDS ({len(self.result.shards)}):{Colors.END}")
+            for shard in self.result.shards:
+                status = f"{Colors.GREEN}✅" if shard['returncode'] == 0 else f"{Colors.RED}❌"
+                print(f"  {status} Shard {shard['index'] + 1}{Colors.END}: "
+                      f"{len(shard['files'])} file(s) in {Colors.CYAN}{shard['duration']:.1f}s{Colors.END}")
+            print(f"  ⏱️  Wall-clock: {Colors.CYAN}{self.result.wall_time:.1f}s{Colors.END} "
+                  f"vs {Colors.CYAN}{serial_time:.1f}s{Colors.END} serial "
+                  f"({Colors.GREEN}{speedup:.2f}x speedup{Colors.END})")
+        
+        # Flaky Tests
+        if flaky_tests:
+            print(f"\n{Colors.BOLD}🎲 FLAKY TESTS ({len(flaky_tests)}):{Colors.END}")
+            for test in flaky_tests:
+                print(f"\n  {Colors.YELLOW}•{Colors.END} {Colors.BOLD}{test.name}{Colors.END}")
+                print(f"     📁 File: {Colors.CYAN}{test.file}{Colors.END}")
+                print(f"     🔁 Passed after {test.retries} retr{'y' if test.retries == 1 else 'ies'}")
+                history = self.flakiness.history(test)
+                if history:
+                    runs = history['passed'] + history['failed'] + history['flaky']
+                    print(f"     📜 History: {Colors.YELLOW}{history['flaky']} flaky, {history['failed']} failed "
+                          f"in {runs} run(s){Colors.END} ({history['history'][-20:]})")
+        
         # Failed Tests
         if self.result.failed_tests:
             print(f"\n{Colors.BOLD}❌ FAILED TESTS ({len(self.result.failed_tests)}):{Colors.END}")
             for i, test in enumerate(self.result.failed_tests, 1):
-                print(f"\n  {Colors.RED}{i}.{Colors.END} {Colors.BOLD}{test['name']}{Colors.END}")
-                print(f"     📁 File: {Colors.CYAN}{test['file']}{Colors.END}")
-                if test.get('rerun_command'):
-                    print(f"     🔄 Rerun: {Colors.YELLOW}{test['rerun_command']}{Colors.END}")
+                print(f"\n  {Colors.RED}{i}.{Colors.END} {Colors.BOLD}{test.name}{Colors.END}")
+                print(f"     📁 File: {Colors.CYAN}{test.file}{Colors.END}")
+                if test.groups:
+                    print(f"     🗂️  Group: {Colors.BLUE}{' › '.join(test.groups)}{Colors.END}")
+                if test.duration_ms is not None:
+                    print(f"     ⏱️  Duration: {Colors.CYAN}{test.duration_ms} ms{Colors.END}")
+                if test.rerun_command:
+                    print(f"     🔄 Rerun: {Colors.YELLOW}{test.rerun_command}{Colors.END}")
+                if test.output:
+                    print(f"     🖨️  Output (last {min(len(test.output), 5)} lines):")
+                    for output_line in test.output[-5:]:
+                        print(f"        {Colors.WHITE}{output_line}{Colors.END}")
         
         # Quick Error Summary
         if self.result.errors:
             print(f"\n{Colors.BOLD}🐛 ERROR SUMMARY ({len(self.result.errors)}):{Colors.END}")
             for i, error in enumerate(self.result.errors, 1):
-                print(f"\n  {Colors.RED}Error {i}:{Colors.END} {Colors.BOLD}{error['test']}{Colors.END}")
-                print(f"     📄 File: {Colors.CYAN}{error['file']}{Colors.END}")
-                print(f"     🏷️  Type: {Colors.MAGENTA}{error['type']}{Colors.END}")
-                if error['line_number']:
-                    print(f"     📍 Line: {Colors.YELLOW}{error['line_number']}{Colors.END}")
-                if error['widget']:
-                    print(f"     🎨 Widget: {Colors.BLUE}{error['widget']}{Colors.END}")
-                if error['message']:
-                    print(f"     💬 Message: {Colors.WHITE}{error['message'][:100]}...{Colors.END}")
+                print(f"\n  {Colors.RED}Error {i}:{Colors.END} {Colors.BOLD}{error.test}{Colors.END}")
+                print(f"     📄 File: {Colors.CYAN}{error.file}{Colors.END}")
+                print(f"     🏷️  Type: {Colors.MAGENTA}{error.type}{Colors.END}")
+                if error.line_number:
+                    print(f"     📍 Line: {Colors.YELLOW}{error.line_number}{Colors.END}")
+                if error.widget:
+                    print(f"     🎨 Widget: {Colors.BLUE}{error.widget}{Colors.END}")
+                if error.message:
+                    print(f"     💬 Message: {Colors.WHITE}{error.message[:100]}...{Colors.END}")
         
         # DETAILED ERROR ANALYSIS
         if self.result.errors:
@@ -497,41 +1527,42 @@ class FlutterTestRunner:
             
             for i, error in enumerate(self.result.errors, 1):
                 print(f"\n{Colors.RED}{Colors.BOLD}═══ ERROR {i} ═══{Colors.END}")
-                print(f"{Colors.BOLD}Test:{Colors.END} {error['test']}")
-                print(f"{Colors.BOLD}File:{Colors.END} {Colors.CYAN}{error['file']}{Colors.END}")
-                print(f"{Colors.BOLD}Type:{Colors.END} {Colors.MAGENTA}{error['type']}{Colors.END}")
+                print(f"{Colors.BOLD}Test:{Colors.END} {error.test}")
+                print(f"{Colors.BOLD}File:{Colors.END} {Colors.CYAN}{error.file}{Colors.END}")
+                print(f"{Colors.BOLD}Type:{Colors.END} {Colors.MAGENTA}{error.type}{Colors.END}")
                 
-                if error['line_number']:
-                    print(f"{Colors.BOLD}Line:{Colors.END} {Colors.YELLOW}{error['line_number']}{Colors.END}")
+                if error.line_number:
+                    print(f"{Colors.BOLD}Line:{Colors.END} {Colors.YELLOW}{error.line_number}{Colors.END}")
                 
-                if error['exception_type']:
-                    print(f"{Colors.BOLD}Exception:{Colors.END} {Colors.RED}{error['exception_type']}{Colors.END}")
+                if error.exception_type:
+                    print(f"{Colors.BOLD}Exception:{Colors.END} {Colors.RED}{error.exception_type}{Colors.END}")
                 
-                if error['overflow_info']:
-                    print(f"{Colors.BOLD}Overflow:{Colors.END} {Colors.YELLOW}{error['overflow_info']}{Colors.END}")
+                if error.overflow_info:
+                    print(f"{Colors.BOLD}Overflow:{Colors.END} {Colors.YELLOW}{error.overflow_info}{Colors.END}")
                 
                 print(f"\n{Colors.BOLD}📄 FULL ERROR MESSAGE:{Colors.END}")
-                print(f"{Colors.WHITE}{error['full_message'] if error['full_message'] else error['message']}{Colors.END}")
+                print(f"{Colors.WHITE}{error.full_message if error.full_message else error.message}{Colors.END}")
                 
-                if error['relevant_error_widget']:
+                if error.relevant_error_widget:
                     print(f"\n{Colors.BOLD}🎨 ERROR-CAUSING WIDGET:{Colors.END}")
-                    print(f"{Colors.BLUE}{error['relevant_error_widget']}{Colors.END}")
+                    print(f"{Colors.BLUE}{error.relevant_error_widget}{Colors.END}")
                 
-                if error['widget'] and error['widget'] != error['relevant_error_widget']:
+                if error.widget and error.widget != error.relevant_error_widget:
                     print(f"\n{Colors.BOLD}🎨 RELATED WIDGET:{Colors.END}")
-                    print(f"{Colors.BLUE}{error['widget']}{Colors.END}")
+                    print(f"{Colors.BLUE}{error.widget}{Colors.END}")
                 
-                if error['stack_trace']:
+                stack_trace = error.stack_trace
+                if stack_trace:
                     print(f"\n{Colors.BOLD}📚 KEY STACK TRACE (First 10 frames):{Colors.END}")
-                    for j, frame in enumerate(error['stack_trace'][:10]):
+                    for frame, highlight in zip(stack_trace[:10], error.stack_highlights):
                         # Highlight frames containing test files
-                        if '.dart:' in frame and ('test' in frame or error['file'].split('/')[-1] in frame):
+                        if highlight:
                             print(f"{Colors.YELLOW}  {frame}{Colors.END}")
                         else:
                             print(f"{Colors.WHITE}  {frame}{Colors.END}")
                     
-                    if len(error['stack_trace']) > 10:
-                        print(f"{Colors.CYAN}  ... and {len(error['stack_trace']) - 10} more frames{Colors.END}")
+                    if len(stack_trace) > 10:
+                        print(f"{Colors.CYAN}  ... and {len(stack_trace) - 10} more frames{Colors.END}")
                 
                 # Provide debugging suggestions
                 print(f"\n{Colors.BOLD}💡 DEBUGGING SUGGESTIONS:{Colors.END}")
@@ -547,7 +1578,7 @@ class FlutterTestRunner:
             recent_passed = self.result.passed_tests[-5:] if len(self.result.passed_tests) > 5 else self.result.passed_tests
             print(f"\n{Colors.BOLD}✅ RECENT PASSED TESTS ({len(recent_passed)} of {len(self.result.passed_tests)}):{Colors.END}")
             for test in recent_passed:
-                print(f"  ✅ {Colors.GREEN}{test['name']}{Colors.END}")
+                print(f"  ✅ {Colors.GREEN}{test.name}{Colors.END}")
         
         print("\n" + "="*80)
         
@@ -559,14 +1590,76 @@ class FlutterTestRunner:
         
         print("="*80 + "\n")
     
-    def get_debugging_suggestions(self, error: Dict) -> List[str]:
+    def display_profile(self, top: int = 10):
+        """Show the slowest tests and files of this run against their recorded history"""
+        tests = [
+            test for test in self.result.passed_tests + self.result.failed_tests
+            if test.duration_ms is not None and not test.cached
+        ]
+        print(f"{Colors.BOLD}{Colors.CYAN}⏱️  TEST PROFILE{Colors.END}")
+        print("="*80)
+        if not tests:
+            print(f"{Colors.YELLOW}No per-test timings were captured in this run{Colors.END}\n")
+            return
+        
+        regressions = []
+        rows = []
+        for test in tests:
+            baseline = self.timings.baseline(test.file, test.name)
+            regressed = self.is_regression(test.duration_ms, baseline)
+            if regressed:
+                regressions.append((test, baseline))
+            rows.append((test.duration_ms, test.name, test.file, baseline, regressed))
+        rows.sort(key=lambda row: -row[0])
+        
+        print(f"\n{Colors.BOLD}🐢 SLOWEST TESTS (top {min(top, len(rows))} of {len(rows)}):{Colors.END}")
+        for duration_ms, name, test_file, baseline, regressed in rows[:top]:
+            marker = f" {Colors.RED}⚠️  regression{Colors.END}" if regressed else ""
+            print(f"  {Colors.CYAN}{duration_ms:>8.0f} ms{Colors.END}  {Colors.BOLD}{name}{Colors.END} "
+                  f"{Colors.WHITE}({test_file}){Colors.END}{marker}")
+            print(f"               {self.format_baseline(baseline)}")
+        
+        if self.result.file_durations:
+            files = sorted(self.result.file_durations.items(), key=lambda item: -item[1])
+            print(f"\n{Colors.BOLD}📁 SLOWEST FILES (top {min(top, len(files))} of {len(files)}):{Colors.END}")
+            for test_file, duration_ms in files[:top]:
+                baseline = self.timings.baseline(test_file)
+                marker = f" {Colors.RED}⚠️  regression{Colors.END}" if self.is_regression(duration_ms, baseline) else ""
+                print(f"  {Colors.CYAN}{duration_ms:>8.0f} ms{Colors.END}  {test_file}{marker}")
+                print(f"               {self.format_baseline(baseline)}")
+        
+        if regressions:
+            print(f"\n{Colors.BOLD}{Colors.RED}⚠️  REGRESSIONS ({len(regressions)}):{Colors.END}")
+            for test, baseline in sorted(regressions, key=lambda item: -item[0].duration_ms):
+                p50 = percentile(baseline, 0.5)
+                print(f"  {Colors.RED}{test.duration_ms:>8.0f} ms{Colors.END}  {Colors.BOLD}{test.name}{Colors.END} "
+                      f"{Colors.WHITE}({test.file}){Colors.END}: {test.duration_ms / p50:.1f}x its p50 of {p50:.0f} ms")
+        print()
+    
+    def is_regression(self, duration_ms: float, baseline: List[float]) -> bool:
+        """Whether a duration is well outside what earlier runs measured"""
+        if len(baseline) < self.REGRESSION_MIN_RUNS:
+            return False
+        p50 = percentile(baseline, 0.5)
+        return (duration_ms > percentile(baseline, 0.95)
+                and duration_ms >= p50 * self.REGRESSION_FACTOR
+                and duration_ms - p50 >= self.REGRESSION_MIN_MS)
+    
+    @staticmethod
+    def format_baseline(baseline: List[float]) -> str:
+        if not baseline:
+            return f"{Colors.YELLOW}no history yet{Colors.END}"
+        return (f"p50 {percentile(baseline, 0.5):.0f} ms · p95 {percentile(baseline, 0.95):.0f} ms "
+                f"over {len(baseline)} earlier run(s)")
+    
+    def get_debugging_suggestions(self, error: TestError) -> List[str]:
         """Generate debugging suggestions based on error type and content"""
         suggestions = []
         
-        error_text = (error.get('full_message', '') + ' ' + 
-                     error.get('message', '') + ' ' + 
-                     error.get('exception_type', '') + ' ' + 
-                     error.get('type', '')).lower()
+        error_text = (error.full_message + ' ' + 
+                     error.message + ' ' + 
+                     error.exception_type + ' ' + 
+                     error.type).lower()
         
         # Widget-specific suggestions
         if 'renderflex overflowed' in error_text or 'overflow' in error_text:
@@ -577,7 +1670,7 @@ class FlutterTestRunner:
                 "Add constraints to limit widget dimensions"
             ])
         
-        if 'builder' in error.get('widget', '').lower():
+        if 'builder' in error.widget.lower():
             suggestions.extend([
                 "Check if the Builder's build function handles null cases",
                 "Verify all required data is available when Builder executes",
@@ -592,11 +1685,11 @@ class FlutterTestRunner:
             ])
         
         # File/Line specific suggestions
-        if error.get('line_number'):
-            suggestions.append(f"Check line {error['line_number']} in {error.get('file', 'the test file')}")
+        if error.line_number:
+            suggestions.append(f"Check line {error.line_number} in {error.file}")
         
         # Widget library errors
-        if 'widgets library' in error.get('type', '').lower():
+        if 'widgets library' in error.type.lower():
             suggestions.extend([
                 "This is a widget construction error - check widget parameters",
                 "Verify all required parameters are provided to widgets",
@@ -604,7 +1697,7 @@ class FlutterTestRunner:
             ])
         
         # Rendering errors
-        if 'rendering library' in error.get('type', '').lower():
+        if 'rendering library' in error.type.lower():
             suggestions.extend([
                 "This is a layout/rendering error",
                 "Check widget sizing and constraints",
@@ -612,7 +1705,7 @@ class FlutterTestRunner:
             ])
         
         # Test framework errors
-        if 'flutter test framework' in error.get('type', '').lower():
+        if 'flutter test framework' in error.type.lower():
             suggestions.extend([
                 "Multiple exceptions occurred during test execution",
                 "Check test setup and teardown procedures",
@@ -630,18 +1723,339 @@ class FlutterTestRunner:
         
         return suggestions
 
+class InotifyWatcher:
+    """Recursive directory watcher built on Linux inotify (through ctypes)"""
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT_HEADER = struct.Struct('iIII')
+    
+    def __init__(self, roots: List[str]):
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches = {}
+        for root in roots:
+            self._add_tree(root)
+    
+    def _add_tree(self, root: str):
+        for directory, _, _ in os.walk(root):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.MASK)
+            if wd >= 0:
+                self._watches[wd] = directory
+    
+    def poll(self, timeout: float = None) -> set:
+        """Wait up to timeout seconds (forever when None) and return the paths that changed"""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self._fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if wd not in self._watches or not name:
+                continue
+            path = os.path.join(self._watches[wd], os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                # New directories need watches of their own
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self._add_tree(path)
+                continue
+            changed.add(os.path.normpath(path))
+        return changed
+
+class PollingWatcher:
+    """Portable fallback that compares file modification times at an interval"""
+    def __init__(self, roots: List[str], interval: float = 1.0):
+        self.roots = roots
+        self.interval = interval
+        self._snapshot = self._scan()
+    
+    def _scan(self) -> Dict:
+        snapshot = {}
+        for root in self.roots:
+            for directory, _, names in os.walk(root):
+                for name in names:
+                    path = os.path.normpath(os.path.join(directory, name))
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+    
+    def poll(self, timeout: float = None) -> set:
+        """Sleep for one interval (or timeout, if shorter) and return the paths that changed"""
+        time.sleep(self.interval if timeout is None else min(self.interval, timeout))
+        snapshot = self._scan()
+        changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                   if snapshot.get(path) != self._snapshot.get(path)}
+        self._snapshot = snapshot
+        return changed
+
+def create_watcher(roots: List[str]):
+    """Watch with inotify where available, falling back to mtime polling"""
+    roots = [root for root in roots if os.path.isdir(root)]
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots)
+
+def wait_for_changes(watcher, debounce: float) -> set:
+    """Block until files change, then keep collecting until they stay quiet for `debounce` seconds"""
+    changed = set()
+    while not changed:
+        changed = watcher.poll()
+    # A poll can also come back empty before its timeout (e.g. only directory events), so the
+    # quiet period is measured against a deadline rather than taken from one empty poll
+    quiet_until = time.monotonic() + debounce
+    while True:
+        remaining = quiet_until - time.monotonic()
+        if remaining <= 0:
+            return changed
+        more = watcher.poll(remaining)
+        if more:
+            changed |= more
+            quiet_until = time.monotonic() + debounce
+
+def watch_tests(options, additional_args: List[str]):
+    """Rerun the tests affected by every burst of saves under lib/ and test/ until interrupted"""
+    targets, passthrough = split_test_args(additional_args)
+    watcher = create_watcher(['lib', 'test'])
+    print(f"{Colors.BLUE}👀 Watching lib/ and test/ ({type(watcher).__name__}) - press Ctrl+C to stop{Colors.END}\n")
+    
+    test_files = discover_test_files(targets)
+    warm = False
+    try:
+        while True:
+            if test_files:
+                runner = FlutterTestRunner(timeout=options.run_timeout, reporter='json')
+                runner.listeners = open_result_writers(options)
+                runner.retry_failures = options.retry_failures
+                args = list(passthrough)
+                # After the first iteration packages are resolved, so skip pub get on reruns
+                if warm and '--no-pub' not in args:
+                    args.append('--no-pub')
+                try:
+                    if options.shards > 1:
+                        runner.run_sharded(options.shards, args + test_files)
+                    else:
+                        runner.run_tests(args + test_files)
+                    if options.retry_failures and runner.result.failed_tests:
+                        runner.retry_failed_tests(options.retry_failures, args, retry_jobs(options))
+                    runner.save_flakiness()
+                finally:
+                    close_result_writers(runner.listeners)
+                runner.display_results()
+                if options.profile:
+                    runner.display_profile(options.profile)
+                warm = True
+            
+            print(f"{Colors.CYAN}👀 Waiting for changes...{Colors.END}")
+            changed = {path for path in wait_for_changes(watcher, options.debounce)
+                       if path.endswith('.dart') or os.path.basename(path) in GLOBAL_TEST_INPUTS}
+            if not changed:
+                test_files = []
+                continue
+            print(f"{Colors.CYAN}📝 Changed: {', '.join(sorted(changed))}{Colors.END}")
+            
+            all_tests = discover_test_files(targets)
+            if any(os.path.basename(path) in GLOBAL_TEST_INPUTS for path in changed):
+                test_files = all_tests
+                warm = False
+                continue
+            affected = DartImportGraph().build().affected_by(changed)
+            test_files = [test_file for test_file in all_tests if os.path.normpath(test_file) in affected]
+            if not test_files:
+                print(f"{Colors.GREEN}✅ No tests affected{Colors.END}\n")
+    except KeyboardInterrupt:
+        print(f"\n{Colors.BLUE}👋 Stopped watching{Colors.END}")
+
+def open_result_writers(options) -> list:
+    """Create the report writers requested on the command line"""
+    writers = []
+    if options.junit_xml:
+        writers.append(JUnitXmlWriter(options.junit_xml))
+    if options.json:
+        writers.append(JsonResultWriter(options.json))
+    return writers
+
+def close_result_writers(writers: list):
+    """Finish the reports, reporting where they were written"""
+    for writer in writers:
+        try:
+            writer.close()
+            print(f"{Colors.CYAN}📝 Wrote {writer.path}{Colors.END}")
+        except OSError as e:
+            print(f"{Colors.YELLOW}⚠️  Could not write {writer.path}: {e}{Colors.END}")
+
+def retry_jobs(options) -> int:
+    """Concurrent retries: the shard count when sharding, otherwise one per CPU core"""
+    return options.shards if options.shards > 1 else os.cpu_count() or 1
+
+def parse_shard_count(value: str) -> int:
+    """argparse type for --shards/--jobs: a positive integer or 'auto'"""
+    if value == 'auto':
+        return os.cpu_count() or 1
+    try:
+        shards = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or 'auto', got {value!r}")
+    if shards < 1:
+        raise argparse.ArgumentTypeError("shard count must be at least 1")
+    return shards
+
 def main():
     """Main function to run the Flutter test runner"""
+    parser = argparse.ArgumentParser(
+        description="Run flutter test and present the results in a readable format. "
+                    "Unrecognized arguments are passed through to `flutter test`.",
+        allow_abbrev=False
+    )
+    # Named so that flutter test's own --reporter and --timeout still pass through
+    parser.add_argument(
+        '--parse-as',
+        choices=FlutterTestRunner.REPORTERS,
+        default='compact',
+        help="Output format to parse: 'compact' scrapes the human reporter, "
+             "'json' drives `flutter test --machine` and decodes its event stream"
+    )
+    parser.add_argument(
+        '--run-timeout',
+        type=int,
+        default=300,
+        metavar='SECONDS',
+        help="Timeout of the whole flutter test run in seconds (default: 300)"
+    )
+    parser.add_argument(
+        '--shards', '--jobs',
+        dest='shards',
+        type=parse_shard_count,
+        default=1,
+        help="Split test files across N concurrent flutter test processes ('auto' uses one per CPU core)"
+    )
+    parser.add_argument(
+        '--changed-since',
+        metavar='GIT_REF',
+        help="Only run test files that import (directly or transitively) a Dart file changed since GIT_REF"
+    )
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help="Skip test files whose transitive Dart sources and pubspec.lock are unchanged since they last passed"
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=20,
+        metavar='MB',
+        help="Size cap of the result cache; least recently used entries are evicted (default: 20)"
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help="Keep running and rerun the tests affected by changes under lib/ and test/"
+    )
+    parser.add_argument(
+        '--debounce',
+        type=float,
+        default=0.5,
+        metavar='SECONDS',
+        help="Quiet period that ends a burst of saves in watch mode (default: 0.5)"
+    )
+    parser.add_argument(
+        '--retry-failures',
+        type=int,
+        default=0,
+        metavar='N',
+        help="Rerun each failed test on its own, in parallel, up to N times; "
+             "tests that pass on a retry are reported as flaky instead of failed"
+    )
+    parser.add_argument(
+        '--profile',
+        type=int,
+        nargs='?',
+        const=10,
+        metavar='N',
+        help="After the results, list the N slowest tests and files (default: 10) with p50/p95 "
+             "from earlier runs, flagging tests that got significantly slower"
+    )
+    parser.add_argument(
+        '--junit-xml',
+        metavar='PATH',
+        help="Also write the results as a JUnit XML report, one test case at a time as tests finish"
+    )
+    parser.add_argument(
+        '--json',
+        metavar='PATH',
+        help="Also write the results, including parsed stack traces, as a JSON report"
+    )
+    options, additional_args = parser.parse_known_args()
+    
     print(f"{Colors.BOLD}{Colors.CYAN}Flutter Test Runner v1.1{Colors.END}")
     print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
-    runner = FlutterTestRunner()
+    if options.watch:
+        watch_tests(options, additional_args)
+        return
+    
+    runner = FlutterTestRunner(timeout=options.run_timeout, reporter=options.parse_as)
+    
+    if options.changed_since:
+        targets, passthrough = split_test_args(additional_args)
+        try:
+            test_files = select_affected_tests(options.changed_since, discover_test_files(targets))
+        except subprocess.CalledProcessError as e:
+            print(f"{Colors.RED}❌ Could not diff against {options.changed_since}: {e.stderr.strip()}{Colors.END}")
+            sys.exit(2)
+        if not test_files:
+            print(f"{Colors.GREEN}✅ No tests affected by changes since {options.changed_since}{Colors.END}")
+            sys.exit(0)
+        print(f"{Colors.CYAN}🎯 {len(test_files)} test file(s) affected by changes since {options.changed_since}{Colors.END}\n")
+        additional_args = passthrough + test_files
+    
+    runner.listeners = open_result_writers(options)
+    runner.retry_failures = options.retry_failures
     
-    # Get additional arguments from command line
-    additional_args = sys.argv[1:] if len(sys.argv) > 1 else None
+    if options.cache:
+        runner.result_cache = ResultCache(max_bytes=options.cache_size * 1024 * 1024)
+        targets, passthrough = split_test_args(additional_args)
+        test_files = runner.skip_cached_tests(discover_test_files(targets), passthrough)
+        if runner.result.cached_files:
+            print(f"{Colors.CYAN}♻️  Reusing cached results for {len(runner.result.cached_files)} unchanged test file(s){Colors.END}\n")
+        if not test_files:
+            close_result_writers(runner.listeners)
+            runner.display_results()
+            sys.exit(0)
+        additional_args = passthrough + test_files
     
-    success = runner.run_tests(additional_args)
+    if options.shards > 1:
+        success = runner.run_sharded(options.shards, additional_args)
+    else:
+        success = runner.run_tests(additional_args or None)
+    if options.retry_failures and runner.result.failed_tests:
+        recovered = runner.retry_failed_tests(options.retry_failures, additional_args, retry_jobs(options))
+        # Retries only vouch for the failures that were parsed; a run that timed out or aborted stays failed
+        if runner.result.completed:
+            success = recovered or success
+    runner.save_flakiness()
+    close_result_writers(runner.listeners)
+    if runner.result_cache:
+        runner.update_result_cache()
     runner.display_results()
+    if options.profile:
+        runner.display_profile(options.profile)
     
     # Exit with appropriate code
     sys.exit(0 if success else 1)
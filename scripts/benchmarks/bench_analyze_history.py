@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Analyze History Benchmark
+Fills a throwaway history database with synthetic runs and times recording
+a run and the queries the report subcommands make
+
+Usage: python scripts/benchmarks/bench_analyze_history.py [--runs N] [--issues N] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from flutter_analysis import AnalyzeHistory, Issue  # noqa: E402
+
+LEVELS = ("info", "warning", "error")
+
+
+def synthetic_issues(count, run):
+    return [
+        Issue(
+            level=LEVELS[i % 3],
+            message=f"Synthetic issue {i} in run {run}",
+            file=f"lib/features/module_{i % 40}/file_{i % 300}.dart",
+            line=10 + i % 500,
+            col=3 + i % 40,
+            rule=f"rule_{(i + run) % 60}",
+        )
+        for i in range(count)
+    ]
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--issues', type=int, default=2000, help='issues per run')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        with AnalyzeHistory(os.path.join(directory, 'history.sqlite3')) as history:
+            started = time.perf_counter()
+            for run in range(args.runs):
+                history.record_run(synthetic_issues(args.issues, run))
+            fill_time = time.perf_counter() - started
+            latest = history.latest_run_id()
+
+            record_time = best_of(args.repeat, lambda: history.record_run(synthetic_issues(args.issues, 0)))
+            rules_time = best_of(args.repeat, lambda: history.rule_totals(100))
+            runs_time = best_of(args.repeat, lambda: history.runs(20))
+            issues_time = best_of(args.repeat, lambda: history.issues(latest))
+            compact_time = best_of(1, lambda: history.compact(keep_details=50))
+
+    print(f"{args.runs} runs x {args.issues} issues (filled in {fill_time:.1f} s), best of {args.repeat}")
+    for label, seconds in (
+        ("record a run", record_time),
+        ("per-rule totals, 100 runs", rules_time),
+        ("list 20 runs", runs_time),
+        ("issues of one run", issues_time),
+        ("compact to 50 runs", compact_time),
+    ):
+        print(f"  {label:<26}: {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
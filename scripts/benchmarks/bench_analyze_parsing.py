@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Analyzer Output Parsing Benchmark
+Compares the line parser in flutter_analysis with the previous backtracking
+regex on a synthetic million-line `flutter analyze` output. The old pattern
+only matches issues under lib/, so the two are compared on lib/-only output;
+the parser is also timed on output with test/ paths and on the equivalent
+`dart analyze --format=machine` output
+
+Usage: python scripts/benchmarks/bench_analyze_parsing.py [--lines N] [--repeat N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from flutter_analysis import Issue, parse_issues  # noqa: E402
+
+LEGACY_LINE_PATTERN = re.compile(
+    r"^(?P<level>\w+)\s•\s(?P<message>.+?)\s•\s(?P<file>lib\/[^\:]+):(?P<line>\d+):(?P<col>\d+)\s•\s(?P<rule>\w+)"
+)
+LEVELS = ("info", "warning", "error")
+RULES = ("prefer_const_constructors", "unused_import", "deprecated_member_use", "use_build_context_synchronously")
+DIRECTORIES = ("lib/features/notes/widgets", "lib/core/database", "test/features/notes", "integration_test")
+LIB_DIRECTORIES = DIRECTORIES[:2]
+
+
+def legacy_parse_issues(output):
+    issues = []
+    for line in output.splitlines():
+        match = LEGACY_LINE_PATTERN.match(line.strip())
+        if match:
+            issues.append(match.groupdict())
+    return issues
+
+
+def synthetic_issues(count, directories=DIRECTORIES):
+    for i in range(count):
+        yield (
+            LEVELS[i % 3],
+            f"'withOpacity' is deprecated and shouldn't be used. Use .withValues() (case {i})",
+            f"{directories[i % len(directories)]}/file_{i % 300}.dart",
+            10 + i % 500,
+            3 + i % 40,
+            RULES[i % 4],
+        )
+
+
+def human_output(count, directories=DIRECTORIES):
+    lines = ["Analyzing MSBridge..."]
+    lines.extend(
+        f"   {level} • {message} • {file}:{line}:{col} • {rule}"
+        for level, message, file, line, col, rule in synthetic_issues(count, directories)
+    )
+    lines.append(f"{count} issues found. (ran in 41.2s)")
+    return "\n".join(lines)
+
+
+def machine_output(count):
+    root = os.getcwd()
+    return "\n".join(
+        f"{level.upper()}|LINT|{rule.upper()}|{root}/{file}|{line}|{col}|9|{message}"
+        for level, message, file, line, col, rule in synthetic_issues(count)
+    )
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    lib_only = human_output(args.lines, LIB_DIRECTORIES)
+    human = human_output(args.lines)
+    machine = machine_output(args.lines)
+
+    # Same issues where both parse everything, and every issue in both formats
+    legacy = legacy_parse_issues(lib_only)
+    assert parse_issues(lib_only) == [Issue.from_dict(data) for data in legacy]
+    assert len(legacy) == args.lines
+    issues = parse_issues(human)
+    assert len(issues) == args.lines
+    assert parse_issues(machine) == issues
+
+    legacy_time = best_of(args.repeat, lambda: legacy_parse_issues(lib_only))
+    lib_time = best_of(args.repeat, lambda: parse_issues(iter(lib_only.splitlines())))
+    human_time = best_of(args.repeat, lambda: parse_issues(iter(human.splitlines())))
+    machine_time = best_of(args.repeat, lambda: parse_issues(iter(machine.splitlines())))
+
+    def row(label, seconds):
+        print(f"  {label:<26}: {seconds * 1000:8.1f} ms  {args.lines / seconds / 1000:7.0f}k issues/s")
+
+    print(f"{args.lines} issue lines, best of {args.repeat}")
+    row("legacy regex, lib/ only", legacy_time)
+    row("line parser, lib/ only", lib_time)
+    row("line parser, all paths", human_time)
+    row("machine format", machine_time)
+    print(f"  speedup on the same input : {legacy_time / lib_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Exception Parsing Benchmark
+Compares the single-pass exception classifier in flutter_test_runner.py with
+the previous multi-pass implementation on a synthetic 100k-line log
+
+Usage: python scripts/benchmarks/bench_exception_parsing.py [--lines N] [--repeat N]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from flutter_test_runner import FlutterTestRunner, TestCase  # noqa: E402
+
+BLOCK_TEMPLATE = [
+    "══╡ EXCEPTION CAUGHT BY RENDERING LIBRARY ╞═════════════════════════════",
+    "The following assertion was thrown during layout:",
+    "A RenderFlex overflowed by {n} pixels on the right.",
+    "The relevant error-causing widget was:",
+    "Row Row:file:///app/lib/features/notes/widgets/note_card.dart:{n}:12",
+    "The overflowing RenderFlex has an orientation of Axis.horizontal.",
+    "Consider applying a flex factor (e.g. using an Expanded widget) to force the children.",
+    "When the exception was thrown, this was the stack:",
+]
+FRAME_TEMPLATE = "#{i}      Element.inflateWidget (package:flutter/src/widgets/framework.dart:{n}:16)"
+TEST_FRAME = "#0      main.<anonymous closure> (file:///app/test/voice_ui_test.dart:{n}:7)"
+
+
+def legacy_process_exception(exception_lines, current_test):
+    """The multi-pass implementation this benchmark measures against"""
+    error_info = {
+        'test': current_test['name'] if current_test else 'Unknown Test',
+        'file': current_test['file'] if current_test else 'Unknown File',
+        'type': 'Unknown Error',
+        'message': '',
+        'full_message': '',
+        'widget': '',
+        'line_number': None,
+        'stack_trace': [],
+        'relevant_error_widget': '',
+        'overflow_info': '',
+        'exception_type': '',
+        'full_stack': '\n'.join(exception_lines)
+    }
+    in_stack_trace = False
+    for i, line in enumerate(exception_lines):
+        if 'EXCEPTION CAUGHT BY' in line:
+            error_info['type'] = line.partition('EXCEPTION CAUGHT BY')[2].strip('═╡╞ ')
+        elif line.startswith('The following'):
+            error_info['message'] = line
+            full_msg_lines = [line]
+            for j in range(i+1, min(i+5, len(exception_lines))):
+                if exception_lines[j] and not exception_lines[j].startswith('The relevant'):
+                    full_msg_lines.append(exception_lines[j])
+                else:
+                    break
+            error_info['full_message'] = '\n'.join(full_msg_lines)
+        elif 'error-causing widget was:' in line:
+            widget_match = re.search(r'widget was:\s*(.+)', line)
+            if widget_match:
+                error_info['widget'] = widget_match.group(1).strip()
+        elif 'The relevant error-causing widget was:' in line:
+            if i+1 < len(exception_lines):
+                error_info['relevant_error_widget'] = exception_lines[i+1].strip()
+        elif 'overflowed by' in line:
+            error_info['overflow_info'] = line.strip()
+        elif line.startswith('Exception:') or line.startswith('AssertionError:') or line.startswith('RenderFlex'):
+            error_info['exception_type'] = line.strip()
+        elif line.startswith('#') and ('(' in line and ')' in line):
+            in_stack_trace = True
+            error_info['stack_trace'].append(line.strip())
+        elif in_stack_trace and line.strip():
+            if not line.startswith('#') and not line.startswith('...'):
+                in_stack_trace = False
+            else:
+                error_info['stack_trace'].append(line.strip())
+    for line in exception_lines:
+        if '.dart:' in line:
+            line_match = re.search(r'\.dart:(\d+)', line)
+            if line_match:
+                error_info['line_number'] = line_match.group(1)
+                break
+    return error_info
+
+
+def synthetic_blocks(total_lines, frames_per_block=40):
+    """Build exception blocks (delimiters excluded) until total_lines is reached"""
+    blocks = []
+    produced = 0
+    n = 0
+    while produced < total_lines:
+        n += 1
+        block = [line.format(n=n) for line in BLOCK_TEMPLATE]
+        block.append(TEST_FRAME.format(n=n))
+        block.extend(FRAME_TEMPLATE.format(i=i, n=n + i) for i in range(1, frames_per_block))
+        block.append("...     Normal element mounting (132 frames)")
+        blocks.append(block)
+        produced += len(block)
+    return blocks, produced
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    blocks, produced = synthetic_blocks(args.lines)
+    legacy_test = {'name': 'renders note card', 'file': 'test/voice_ui_test.dart'}
+    test = TestCase(**legacy_test)
+
+    def run_legacy():
+        for block in blocks:
+            legacy_process_exception(block, legacy_test)
+
+    def run_single_pass():
+        runner = FlutterTestRunner(live=False)
+        for block in blocks:
+            runner.process_exception(block, test)
+
+    # Both implementations must agree on the fields they share before timing means anything
+    runner = FlutterTestRunner(live=False)
+    runner.process_exception(blocks[0], test)
+    legacy = legacy_process_exception(blocks[0], legacy_test)
+    for key in ('type', 'message', 'full_message', 'overflow_info', 'exception_type',
+                'line_number', 'stack_trace', 'full_stack'):
+        assert getattr(runner.result.errors[0], key) == legacy[key], key
+
+    legacy_time = best_of(args.repeat, run_legacy)
+    single_time = best_of(args.repeat, run_single_pass)
+    print(f"{len(blocks)} exception blocks, {produced} lines, best of {args.repeat}")
+    print(f"  legacy multi-pass : {legacy_time * 1000:8.1f} ms")
+    print(f"  single-pass       : {single_time * 1000:8.1f} ms")
+    print(f"  speedup           : {legacy_time / single_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Issue Writer Benchmark
+Compares peak memory and time of building a SARIF log as one JSON document
+against streaming it with SarifWriter, for synthetic issues fed from the
+parser as analyzer output lines arrive
+
+Usage: python scripts/benchmarks/bench_issue_writers.py [--issues N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from flutter_analysis import SarifWriter, iter_issues  # noqa: E402
+from flutter_analysis.writers import SARIF_LEVELS, SARIF_SCHEMA  # noqa: E402
+
+LEVELS = ("info", "warning", "error")
+RULES = ("prefer_const_constructors", "unused_import", "deprecated_member_use", "use_build_context_synchronously")
+
+
+def analyzer_lines(count):
+    for i in range(count):
+        yield (
+            f"   {LEVELS[i % 3]} • Synthetic issue {i} • lib/features/module_{i % 40}/file_{i % 300}.dart:"
+            f"{10 + i % 500}:{3 + i % 40} • {RULES[i % 4]}"
+        )
+
+
+def document_sarif(lines, path):
+    """The whole log as one object, as a single json.dumps() needs it"""
+    issues = list(iter_issues(lines))
+    results = [
+        {
+            "ruleId": issue.rule,
+            "level": SARIF_LEVELS[issue.level],
+            "message": {"text": issue.message},
+            "locations": [
+                {
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": issue.file},
+                        "region": {"startLine": issue.line, "startColumn": issue.col},
+                    }
+                }
+            ],
+        }
+        for issue in issues
+    ]
+    rules = [{"id": rule} for rule in sorted({issue.rule for issue in issues})]
+    log = {
+        "$schema": SARIF_SCHEMA,
+        "version": "2.1.0",
+        "runs": [{"tool": {"driver": {"name": "dart analyze", "rules": rules}}, "results": results}],
+    }
+    Path(path).write_text(json.dumps(log, indent=1), encoding="utf-8")
+
+
+def streamed_sarif(lines, path):
+    with SarifWriter(path) as writer:
+        writer.write_all(iter_issues(lines))
+
+
+def measure(func, count, path):
+    # Timed without tracing, which slows allocation-heavy code severalfold
+    started = time.perf_counter()
+    func(analyzer_lines(count), path)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    func(analyzer_lines(count), path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--issues', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'report.sarif')
+        document_time, document_peak = measure(document_sarif, args.issues, path)
+        streamed_time, streamed_peak = measure(streamed_sarif, args.issues, path)
+        with open(path, encoding='utf-8') as f:
+            assert len(json.load(f)["runs"][0]["results"]) == args.issues
+
+    print(f"{args.issues} issues")
+    print(f"  whole document    : {document_time:8.2f} s  peak {document_peak / 2**20:8.2f} MiB")
+    print(f"  streamed          : {streamed_time:8.2f} s  peak {streamed_peak / 2**20:8.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
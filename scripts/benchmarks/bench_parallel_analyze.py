@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Parallel Analyze Benchmark
+Times a plain project-root `flutter analyze` against N concurrent workers from
+flutter_analysis, and checks both produce the same issues
+
+Run from the project root: python scripts/benchmarks/bench_parallel_analyze.py [--jobs N] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from flutter_analysis import group_issues, project_dart_files, run_analyze  # noqa: E402
+
+
+def timed(jobs):
+    started = time.perf_counter()
+    issues = run_analyze(None, jobs)
+    return time.perf_counter() - started, group_issues(issues)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    paths = project_dart_files()
+    if not paths:
+        sys.exit("No Dart files found - run this from the project root")
+
+    serial_times, parallel_times = [], []
+    for _ in range(args.repeat):
+        # One worker is a single analyzer run at the project root, not a chunked run
+        serial_time, serial_result = timed(1)
+        parallel_time, parallel_result = timed(args.jobs)
+        # A faster run only counts if it found exactly the same issues
+        assert serial_result == parallel_result, "parallel analyze produced different issues"
+        serial_times.append(serial_time)
+        parallel_times.append(parallel_time)
+
+    serial_best, parallel_best = min(serial_times), min(parallel_times)
+    issues, _ = serial_result
+    print(f"{len(paths)} files, {sum(len(file_issues) for file_issues in issues.values())} issues, "
+          f"best of {args.repeat}")
+    print(f"  project root      : {serial_best:8.2f} s")
+    print(f"  {f'{args.jobs} workers':<18}: {parallel_best:8.2f} s")
+    print(f"  speedup           : {serial_best / parallel_best:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Result Memory Benchmark
+Compares the memory held by a large run's results in the previous dict-based
+representation with the slotted TestCase/TestError records and shared trace
+buffer in flutter_test_runner.py
+
+Usage: python scripts/benchmarks/bench_result_memory.py [--tests N] [--files N] [--lines N]
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_exception_parsing import legacy_process_exception, synthetic_blocks  # noqa: E402
+from flutter_test_runner import FlutterTestRunner, TestCase  # noqa: E402
+
+
+def synthetic_tests(count, files):
+    """Machine reporter fields for `count` tests spread over `files` test files"""
+    for i in range(count):
+        # Built per test, like paths decoded from reporter JSON, so equal names are not shared
+        yield {
+            'name': f"note editor case {i}",
+            'file': f"test/features/module_{i % files}/widget_test.dart",
+            'time': '00:12',
+            'groups': [],
+            'start_ms': i * 3,
+        }
+
+
+def legacy_results(tests, files, blocks):
+    passed_tests = []
+    for fields in synthetic_tests(tests, files):
+        passed_tests.append({
+            **fields,
+            'status': 'PASSED',
+            'rerun_command': None,
+            'duration_ms': 3,
+            'output': []
+        })
+    errors = []
+    for i, block in enumerate(blocks):
+        errors.append(legacy_process_exception(block, passed_tests[i % len(passed_tests)]))
+    return passed_tests, errors
+
+
+def slotted_results(tests, files, blocks):
+    runner = FlutterTestRunner(live=False)
+    for fields in synthetic_tests(tests, files):
+        runner.result.passed_tests.append(TestCase(**fields, status='PASSED', duration_ms=3))
+    for i, block in enumerate(blocks):
+        runner.process_exception(block, runner.result.passed_tests[i % len(runner.result.passed_tests)])
+    return runner.result
+
+
+def measure(build):
+    """Bytes still allocated once the results are built and the input is released"""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    results = build()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del results
+    return retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tests', type=int, default=50_000)
+    parser.add_argument('--files', type=int, default=400)
+    parser.add_argument('--lines', type=int, default=100_000, help='exception log lines')
+    args = parser.parse_args()
+
+    blocks, produced = synthetic_blocks(args.lines)
+
+    # Both representations must carry the same information before comparing their size
+    result = slotted_results(1, 1, blocks[:1])
+    legacy = legacy_results(1, 1, blocks[:1])[1][0]
+    for key in ('type', 'message', 'full_message', 'line_number', 'stack_trace', 'full_stack'):
+        assert getattr(result.errors[0], key) == legacy[key], key
+
+    legacy_bytes = measure(lambda: legacy_results(args.tests, args.files, blocks))
+    slotted_bytes = measure(lambda: slotted_results(args.tests, args.files, blocks))
+    print(f"{args.tests} tests in {args.files} files, {len(blocks)} errors from {produced} lines")
+    print(f"  dict records      : {legacy_bytes / 1024 / 1024:8.1f} MiB")
+    print(f"  slotted records   : {slotted_bytes / 1024 / 1024:8.1f} MiB")
+    print(f"  reduction         : {legacy_bytes / slotted_bytes:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import shutil
 import subprocess
+import random
 import re
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
 from datetime import datetime, date
 from pathlib import Path
 import os
-import google.generativeai as genai
 
 # -------------------
 # CONFIG
@@ -16,7 +23,21 @@ AUTHOR = {
 }
 OG_IMAGE = "/assets/blog/org/msbridge.png"
 COVER_BASE = "/assets/blog/post/"
-APK_SRC = "build/app/outputs/flutter-apk/app-release.apk"
+APK_OUTPUT_DIR = "build/app/outputs/flutter-apk"
+BUNDLE_OUTPUT_DIR = "build/app/outputs/bundle"
+
+# What a release ships: every combination of ABI x flavor x format. "universal" is a
+# single APK for all ABIs; None as the flavor means the project's default (it has no flavors).
+RELEASE_MATRIX = {
+    "abis": ["universal", "armeabi-v7a", "arm64-v8a", "x86_64"],
+    "flavors": [None],
+    "formats": ["apk", "appbundle"],
+}
+# flutter build --target-platform value per ABI
+TARGET_PLATFORMS = {"armeabi-v7a": "android-arm", "arm64-v8a": "android-arm64", "x86_64": "android-x64"}
+# The artifact constants.ts links as downloadUrl, in order of preference. Only the
+# universal APK installs on every device; the others are fallbacks for custom matrices.
+PRIMARY_ABIS = ("universal", "arm64-v8a")
 
 BLOG_DIR = "/Users/prometheus/Code/blog-starter-kit/_posts/"
 DOWNLOADS_DIR = "/Users/prometheus/Code/blog-starter-kit/public/downloads/"
@@ -24,6 +45,35 @@ BASE_BRANCH = "main"
 PROJECT_ROOT = "/Users/prometheus/Code/blog-starter-kit"
 CONSTANTS_FILE = os.path.join(PROJECT_ROOT, "src/lib/constants.ts")
 
+# Build fingerprints and the artifact store, relative to the Flutter project
+RELEASE_CACHE = Path(".release_cache")
+# keys/ holds the upload keystore android/app/key.properties signs with
+BUILD_INPUTS = ("pubspec.yaml", "pubspec.lock", "lib", "android", "assets", "keys")
+# Inputs an incremental Gradle/Dart build may not pick up correctly; a change forces flutter clean.
+# "flutter" is the SDK version, which build_fingerprint() adds next to the files.
+CLEAN_TRIGGERS = ("pubspec.lock", "android", "flutter")
+# Generated or IDE directories inside the inputs
+SKIPPED_DIRS = {"build", ".gradle", ".cxx", ".idea", ".dart_tool", "captures"}
+# Machine-local or generated files inside the inputs (git-ignored in android/). flutter
+# build/run rewrites local.properties with the build mode and version code every time.
+SKIPPED_FILES = {"local.properties", "GeneratedPluginRegistrant.java", "gradle-wrapper.jar", "gradlew", "gradlew.bat"}
+# One copy of the build inputs per build job, each with its own build/ directory, so
+# builds can run side by side and keep their incremental state between releases
+WORKSPACES_DIR = RELEASE_CACHE / "workspaces"
+# Content-addressed artifact store: objects/<sha256[:2]>/<sha256>, plus one ref file per
+# build fingerprint naming the objects it produced
+STORE_DIR = RELEASE_CACHE / "store"
+# Generated release notes, keyed by backend, version, commits and prompt
+NOTES_CACHE = RELEASE_CACHE / "notes"
+# Seconds per notes request, attempts, and the first retry delay (doubled on each further retry)
+NOTES_TIMEOUT = 120
+NOTES_ATTEMPTS = 4
+NOTES_BACKOFF = 2.0
+# Build fingerprints whose artifacts survive garbage collection of the store
+ARTIFACT_CACHE_ENTRIES = 5
+# Linux FICLONE ioctl (_IOW(0x94, 9, int)), a copy-on-write clone on btrfs/XFS
+FICLONE = 0x40049409
+
 
 # -------------------
 # COLORS
@@ -37,17 +87,19 @@ class Colors:
     ENDC = "\033[0m"
     BOLD = "\033[1m"
 
-def step(title): print(f"\n{Colors.OKBLUE}{Colors.BOLD}==> {title}{Colors.ENDC}")
-def success(msg): print(f"{Colors.OKGREEN}✔ {msg}{Colors.ENDC}")
-def info(msg): print(f"{Colors.OKCYAN}ℹ {msg}{Colors.ENDC}")
-def warn(msg): print(f"{Colors.WARNING}⚠ {msg}{Colors.ENDC}")
-def error(msg): print(f"{Colors.FAIL}✘ {msg}{Colors.ENDC}")
+# Each message goes out in one write, so lines from concurrent pipeline stages do not run together
+def emit(line): print(line + "\n", end="", flush=True)
+def step(title): emit(f"\n{Colors.OKBLUE}{Colors.BOLD}==> {title}{Colors.ENDC}")
+def success(msg): emit(f"{Colors.OKGREEN}✔ {msg}{Colors.ENDC}")
+def info(msg): emit(f"{Colors.OKCYAN}ℹ {msg}{Colors.ENDC}")
+def warn(msg): emit(f"{Colors.WARNING}⚠ {msg}{Colors.ENDC}")
+def error(msg): emit(f"{Colors.FAIL}✘ {msg}{Colors.ENDC}")
 
 # -------------------
 # HELPERS
 # -------------------
-def run_cmd(cmd):
-    return subprocess.check_output(cmd, shell=True, text=True).strip()
+def run_cmd(cmd, cwd=None):
+    return subprocess.check_output(cmd, shell=True, text=True, cwd=cwd).strip()
 
 def get_flutter_version():
     with open("pubspec.yaml", "r") as f:
@@ -74,16 +126,13 @@ def clean_commit(msg):
     return re.sub(r"^[a-z]+(\(.*\))?:\s*", "", msg, flags=re.IGNORECASE)
 
 # -------------------
-# AI Release Notes Generator (Gemini 2.5 Pro)
+# RELEASE NOTES
 # -------------------
-def generate_ai_release_notes(version, commits):
-    genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
-    model = genai.GenerativeModel("gemini-2.5-pro")
-
+def build_notes_prompt(version, commits):
     commit_text = "\n".join(commits) if commits else "No specific commits."
 
     # Ask for both long blog post + short changelog
-    prompt = f"""
+    return f"""
     You are a release notes generator for MSBridge.
 
     Version: {version}
@@ -105,25 +154,139 @@ def generate_ai_release_notes(version, commits):
       - Conversational yet professional tone
     """
 
-    response = model.generate_content(prompt)
-    output = response.text.strip()
-
-    parts = output.split("\n", 1)
+def parse_notes_output(output):
+    """Split the model output into (changelog, blog_post): the first line is the changelog"""
+    parts = output.strip().split("\n", 1)
     changelog = parts[0].strip().strip('"')
     blog_post = parts[1].strip() if len(parts) > 1 else ""
+    return changelog, blog_post
+
+class NotesBackend(ABC):
+    """Something that answers the release notes prompt"""
+    name = None
+
+    @abstractmethod
+    def complete(self, version, commits, prompt, timeout):
+        """The model's answer to the prompt, as text"""
+
+    def retryable_errors(self):
+        """Exceptions worth another attempt: timeouts, dropped connections, rate limits"""
+        return (TimeoutError, ConnectionError)
+
+class GeminiBackend(NotesBackend):
+    name = "gemini"
+    model_name = "gemini-2.5-pro"
+
+    def __init__(self):
+        self.model = None
+
+    def complete(self, version, commits, prompt, timeout):
+        # Set up once, on first use, so the stub backend (and --help) work without the SDK installed
+        if self.model is None:
+            import google.generativeai as genai
+
+            genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+            self.model = genai.GenerativeModel(self.model_name)
+        response = self.model.generate_content(prompt, request_options={"timeout": timeout})
+        return response.text
+
+    def retryable_errors(self):
+        from google.api_core import exceptions
+
+        return super().retryable_errors() + (
+            exceptions.ResourceExhausted,
+            exceptions.ServiceUnavailable,
+            exceptions.InternalServerError,
+            exceptions.DeadlineExceeded,
+        )
+
+class StubBackend(NotesBackend):
+    """Offline stand-in built from the commit subjects, for testing and benchmarking the release.
 
+    `delay` simulates model latency and the first `failures` calls raise
+    ConnectionError, to exercise the retry path.
+    """
+    name = "stub"
+
+    def __init__(self, delay=0.0, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+
+    def complete(self, version, commits, prompt, timeout):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise ConnectionError(f"stub failure {self.calls} of {self.failures}")
+        cleaned = [clean_commit(c) for c in commits] or ["Maintenance release"]
+        bullets = "\n".join(f"- {c}" for c in cleaned)
+        return (
+            f"{APP_NAME} {version}: " + "; ".join(cleaned[:3]) + "\n"
+            f"{APP_NAME} {version} is out.\n\n## What's New\n\n{bullets}\n"
+        )
+
+NOTES_BACKENDS = {
+    "gemini": GeminiBackend,
+    "stub": StubBackend,
+}
+
+def call_with_timeout(func, timeout, *args):
+    """func(*args), raising TimeoutError after `timeout` seconds whether or not func honours it"""
+    pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        return pool.submit(func, *args).result(timeout)
+    except FutureTimeoutError:
+        raise TimeoutError(f"no answer within {timeout:g}s") from None
+    finally:
+        # A call that timed out is abandoned, not waited for
+        pool.shutdown(wait=False)
+
+def notes_cache_path(backend, version, commits, prompt):
+    key = json.dumps({
+        "backend": backend.name,
+        "version": version,
+        "commits": commits,
+        "prompt": hashlib.sha256(prompt.encode()).hexdigest(),
+    })
+    return NOTES_CACHE / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+def generate_release_notes(version, commits, backend, timeout=NOTES_TIMEOUT, attempts=NOTES_ATTEMPTS, use_cache=True):
+    """(changelog, blog_post) for a release, from the cache or the backend with retries"""
+    prompt = build_notes_prompt(version, commits)
+    cache_path = notes_cache_path(backend, version, commits, prompt)
+    cached = load_json(cache_path, None) if use_cache else None
+    if cached:
+        info(f"Reusing release notes cached at {cache_path}")
+        return cached["changelog"], cached["blog_post"]
+
+    retryable = backend.retryable_errors()
+    for attempt in range(1, attempts + 1):
+        try:
+            output = call_with_timeout(backend.complete, timeout, version, commits, prompt, timeout)
+            break
+        except retryable as e:
+            if attempt == attempts:
+                error(f"{backend.name} failed {attempts} times, giving up: {e!r}")
+                raise
+            # Exponential backoff with jitter, so parallel releases do not retry in lockstep
+            delay = NOTES_BACKOFF * 2 ** (attempt - 1) * random.uniform(0.5, 1.0)
+            warn(f"{backend.name} attempt {attempt}/{attempts} failed ({e!r}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    changelog, blog_post = parse_notes_output(output)
+    save_json(cache_path, {"changelog": changelog, "blog_post": blog_post})
     return changelog, blog_post
 
 # -------------------
 # BLOG FILE CREATION
 # -------------------
-def create_blog_post(version, commits):
+def create_blog_post(version, commits, backend, **notes_options):
     slug = format_version(version)
     date_str = datetime.utcnow().isoformat() + "Z"
     cover_image = f"{COVER_BASE}{slug.lower()}.webp"
 
-    info("Generating changelog + blog post with Gemini 2.5 Pro...")
-    changelog, body = generate_ai_release_notes(version, commits)
+    info(f"Generating changelog + blog post with the {backend.name} backend...")
+    changelog, body = generate_release_notes(version, commits, backend, **notes_options)
 
     # YAML header
     header = f"""---
@@ -148,31 +311,359 @@ ogImage:
     return changelog  
 
 # -------------------
-# APK BUILD & MOVE
+# BUILD FINGERPRINT
 # -------------------
-def build_and_move_apk(version):
-    step("Building APK")
-    run_cmd("flutter clean")
-    run_cmd("flutter build apk --release")
+def load_json(path, default):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def save_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_suffix(".tmp")
+    with open(temp, "w") as f:
+        json.dump(data, f)
+    temp.replace(path)
+
+def file_sha256(path):
+    """Digest of a file read in 1 MiB chunks, so large artifacts are never held in memory"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def iter_input_files(root):
+    root = Path(root)
+    if root.is_file():
+        yield root.as_posix()
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIPPED_DIRS)
+        for name in sorted(filenames):
+            if name not in SKIPPED_FILES:
+                yield Path(dirpath, name).as_posix()
+
+def flutter_toolchain():
+    """Framework, engine and Dart SDK versions from `flutter --version --machine`"""
+    output = run_cmd("flutter --version --machine")
+    # Banners (upgrade notices, running as root) can precede the JSON
+    try:
+        version = json.loads(output[output.index("{"):])
+    except ValueError:
+        return output
+    return json.dumps(version, sort_keys=True)
+
+def build_fingerprint():
+    """Hash of every build input and the Flutter SDK version, plus one hash per top-level input.
+
+    File digests are cached by size and mtime, so only files touched since
+    the last release are read again.
+    """
+    cache_path = RELEASE_CACHE / "file_hashes.json"
+    old_hashes = load_json(cache_path, {})
+    hashes = {}
+    inputs = {}
+    for root in BUILD_INPUTS:
+        digest = hashlib.sha256()
+        for path in iter_input_files(root):
+            stat = os.stat(path)
+            cached = old_hashes.get(path)
+            if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+                file_hash = cached[2]
+            else:
+                file_hash = file_sha256(path)
+            hashes[path] = [stat.st_size, stat.st_mtime_ns, file_hash]
+            digest.update(f"{path}\0{file_hash}\n".encode())
+        inputs[root] = digest.hexdigest()
+    save_json(cache_path, hashes)
+    inputs["flutter"] = hashlib.sha256(flutter_toolchain().encode()).hexdigest()
+
+    fingerprint = hashlib.sha256("".join(f"{k}={v}\n" for k, v in inputs.items()).encode()).hexdigest()
+    return fingerprint, inputs
+
+def clean_reason(inputs, force_clean):
+    """Why the build must start with flutter clean, or None if an incremental build is safe"""
+    if force_clean:
+        return "--clean was given"
+    last_build = load_json(RELEASE_CACHE / "last_build.json", None)
+    if last_build is None:
+        return "no previous build recorded"
+    changed = [name for name in CLEAN_TRIGGERS if last_build["inputs"].get(name) != inputs[name]]
+    if changed:
+        return f"{', '.join(changed)} changed since the last build"
+    return None
 
-    apk_src = Path(f"./{APK_SRC}")
-    if not apk_src.exists():
-        error("APK not found. Did flutter build fail?")
-        raise FileNotFoundError("APK not found.")
+# -------------------
+# ARTIFACT STORE
+# -------------------
+def object_path(digest):
+    return STORE_DIR / "objects" / digest[:2] / digest
+
+def link_or_copy(src, dest):
+    """Make dest share src's data: a hardlink, else a reflink, else a plain copy"""
+    try:
+        os.link(src, dest)
+        return "hardlink"
+    except OSError:
+        pass
+    try:
+        import fcntl
+        with open(src, "rb") as s, open(dest, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return "reflink"
+    except (ImportError, OSError):
+        pass
+    shutil.copyfile(src, dest)
+    return "copy"
+
+def add_object(path):
+    """Move a file into the store and return its digest; identical content is stored once"""
+    digest = file_sha256(path)
+    target = object_path(digest)
+    if target.exists():
+        os.unlink(path)
+        return digest
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # Downloads are links to the object, so it must never be modified in place
+    os.chmod(path, 0o444)
+    os.replace(path, target)
+    return digest
+
+def verify_object(digest):
+    """Whether the object is intact; a damaged one is removed so the next build replaces it"""
+    target = object_path(digest)
+    if not target.exists():
+        return False
+    if file_sha256(target) != digest:
+        warn(f"Stored artifact {digest[:12]} is damaged, rebuilding it")
+        target.unlink()
+        return False
+    return True
+
+def publish_object(digest, dest):
+    """Atomically put an object's content at dest: link to a temp name, then rename over dest"""
+    if dest.exists() and os.path.samefile(dest, object_path(digest)):
+        return "hardlink"
+    temp = dest.with_name(f".{dest.name}.tmp")
+    temp.unlink(missing_ok=True)
+    method = link_or_copy(object_path(digest), temp)
+    os.replace(temp, dest)
+    return method
+
+def build_refs_path(fingerprint):
+    return STORE_DIR / "builds" / f"{fingerprint}.json"
+
+def collect_garbage(keep=ARTIFACT_CACHE_ENTRIES):
+    """Drop the refs of all but the newest `keep` builds, then every object no ref names"""
+    refs = sorted((STORE_DIR / "builds").glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in refs[keep:]:
+        stale.unlink()
+    live = {digest for ref in refs[:keep] for digest in load_json(ref, {}).values()}
+    freed = 0
+    for obj in (STORE_DIR / "objects").glob("*/*"):
+        if obj.name not in live:
+            # Space is only freed if no published download is still linked to the data
+            stat = obj.stat()
+            freed += stat.st_size if stat.st_nlink == 1 else 0
+            obj.unlink()
+    shutil.rmtree(STORE_DIR / "incoming", ignore_errors=True)
+    if freed:
+        info(f"Artifact store: freed {freed / 2**20:.1f} MiB of unreferenced objects")
 
-    apk_name = f"ms-bridge-{version}.apk"
-    apk_dest = Path(DOWNLOADS_DIR) / apk_name
+# -------------------
+# RELEASE MATRIX
+# -------------------
+def artifact_name(version, flavor, abi, build_format):
+    parts = ["ms-bridge", version] + ([flavor] if flavor else []) + ([abi] if abi != "universal" else [])
+    return "-".join(parts) + (".aab" if build_format == "appbundle" else ".apk")
 
-    Path(DOWNLOADS_DIR).mkdir(parents=True, exist_ok=True)
-    apk_src.replace(apk_dest)
+def plan_builds(version, matrix):
+    """Turn the matrix into flutter build invocations and the artifacts each one produces.
 
-    success(f"APK moved to {apk_dest}")
-    return f"/downloads/{apk_name}"
+    Split ABIs of one flavor come from a single `--split-per-abi` build, and
+    an app bundle always holds every ABI, so there are far fewer builds than
+    matrix cells.
+    """
+    jobs = []
+    for flavor in matrix["flavors"]:
+        flavor_arg = f" --flavor {flavor}" if flavor else ""
+        variant = f"-{flavor}" if flavor else ""
+        split_abis = [abi for abi in matrix["abis"] if abi != "universal"]
+        platforms = ",".join(TARGET_PLATFORMS[abi] for abi in split_abis)
+        for build_format in matrix["formats"]:
+            if build_format == "appbundle":
+                bundle_dir = f"{flavor}Release" if flavor else "release"
+                jobs.append({
+                    "name": f"appbundle{variant}",
+                    "cmd": f"flutter build appbundle --release{flavor_arg}",
+                    "artifacts": [{
+                        "src": f"{BUNDLE_OUTPUT_DIR}/{bundle_dir}/app{variant}-release.aab",
+                        "name": artifact_name(version, flavor, "universal", build_format),
+                        "format": build_format, "abi": "universal", "flavor": flavor,
+                    }],
+                })
+                continue
+            if split_abis:
+                jobs.append({
+                    "name": f"apk{variant}-split",
+                    "cmd": f"flutter build apk --release{flavor_arg} --split-per-abi --target-platform {platforms}",
+                    "artifacts": [
+                        {
+                            "src": f"{APK_OUTPUT_DIR}/app-{abi}{variant}-release.apk",
+                            "name": artifact_name(version, flavor, abi, build_format),
+                            "format": build_format, "abi": abi, "flavor": flavor,
+                        }
+                        for abi in split_abis
+                    ],
+                })
+            if "universal" in matrix["abis"]:
+                jobs.append({
+                    "name": f"apk{variant}-universal",
+                    "cmd": f"flutter build apk --release{flavor_arg}",
+                    "artifacts": [{
+                        "src": f"{APK_OUTPUT_DIR}/app{variant}-release.apk",
+                        "name": artifact_name(version, flavor, "universal", build_format),
+                        "format": build_format, "abi": "universal", "flavor": flavor,
+                    }],
+                })
+    return jobs
+
+def sync_workspace(workspace):
+    """Mirror the build inputs into a job's workspace, copying only files changed since the last sync.
+
+    Generated directories there (build/, .dart_tool/, .gradle/) are left alone,
+    and so are the generated files flutter build recreates.
+    """
+    wanted = set()
+    for root in BUILD_INPUTS:
+        for path in iter_input_files(root):
+            wanted.add(path)
+            target = workspace / path
+            stat = os.stat(path)
+            try:
+                current = os.stat(target)
+                if current.st_size == stat.st_size and current.st_mtime_ns == stat.st_mtime_ns:
+                    continue
+            except FileNotFoundError:
+                target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, target)
+    for root in BUILD_INPUTS:
+        for path in iter_input_files(workspace / root):
+            if Path(path).relative_to(workspace).as_posix() not in wanted:
+                os.unlink(path)
+
+def cached_build(job, refs):
+    """Digests of the job's artifacts from a previous build with the same inputs, if all are intact"""
+    digests = [refs.get(a["name"]) for a in job["artifacts"]]
+    if all(digests) and all(verify_object(digest) for digest in digests):
+        return digests
+    return None
+
+def run_build_job(job, digests, clean=False):
+    """Build one job in its workspace, unless its stored `digests` are given, and return its manifest entries"""
+    if digests:
+        info(f"{job['name']}: inputs unchanged since a previous build, reused stored artifacts")
+    else:
+        incoming = STORE_DIR / "incoming" / job["name"]
+        incoming.mkdir(parents=True, exist_ok=True)
+        workspace = WORKSPACES_DIR / job["name"]
+        sync_workspace(workspace)
+        if clean:
+            run_cmd("flutter clean", cwd=workspace)
+        info(f"{job['name']}: {job['cmd']}")
+        run_cmd(job["cmd"], cwd=workspace)
+        # Moved out of build/ before the next build can overwrite them
+        for artifact in job["artifacts"]:
+            src = workspace / artifact["src"]
+            if not src.exists():
+                error(f"{src} not found. Did flutter build fail?")
+                raise FileNotFoundError(f"{src} not found.")
+            src.replace(incoming / artifact["name"])
+        digests = [add_object(incoming / a["name"]) for a in job["artifacts"]]
+
+    entries = []
+    for artifact, digest in zip(job["artifacts"], digests):
+        entries.append({
+            "name": artifact["name"],
+            "format": artifact["format"],
+            "abi": artifact["abi"],
+            "flavor": artifact["flavor"],
+            "size": object_path(digest).stat().st_size,
+            "sha256": digest,
+            "url": f"/downloads/{artifact['name']}",
+        })
+    success(f"{job['name']}: {', '.join(e['name'] for e in entries)}")
+    return entries
+
+def build_release_matrix(version, matrix=RELEASE_MATRIX, jobs=2, force_clean=False):
+    """Build every artifact of the matrix, publish them to DOWNLOADS_DIR and write their manifest.
+
+    Up to `jobs` builds run at once, each in its own workspace (see
+    WORKSPACES_DIR), since one project directory has a single build/.
+    """
+    step("Building release matrix")
+    fingerprint, inputs = build_fingerprint()
+    info(f"Build fingerprint: {fingerprint[:12]}")
+    builds = plan_builds(version, matrix)
+    refs_path = build_refs_path(fingerprint)
+    refs = {} if force_clean else load_json(refs_path, {})
+
+    reusable = [cached_build(job, refs) for job in builds]
+    clean = False
+    if not all(reusable):
+        reason = clean_reason(inputs, force_clean)
+        if reason:
+            info(f"Running flutter clean before each build: {reason}")
+            clean = True
+        else:
+            info("Skipping flutter clean: dependencies, Android config and Flutter SDK unchanged")
+        built = True
+    else:
+        built = False
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        results = list(pool.map(lambda job, digests: run_build_job(job, digests, clean), builds, reusable))
+    artifacts = [entry for entries in results for entry in entries]
+    # Rewritten on reuse too: the ref's mtime is what retention goes by
+    save_json(refs_path, {**refs, **{a["name"]: a["sha256"] for a in artifacts}})
+    if built:
+        save_json(RELEASE_CACHE / "last_build.json", {"fingerprint": fingerprint, "inputs": inputs})
+
+    Path(DOWNLOADS_DIR).mkdir(parents=True, exist_ok=True)
+    methods = [publish_object(a["sha256"], Path(DOWNLOADS_DIR) / a["name"]) for a in artifacts]
+    collect_garbage()
+
+    manifest = {"version": version, "fingerprint": fingerprint, "artifacts": artifacts}
+    manifest_path = Path(DOWNLOADS_DIR) / f"ms-bridge-{version}-manifest.json"
+    temp = manifest_path.with_name(f".{manifest_path.name}.tmp")
+    with open(temp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    temp.replace(manifest_path)
+    success(
+        f"{len(artifacts)} artifact(s) published to {DOWNLOADS_DIR} "
+        f"({', '.join(sorted(set(methods)))}), manifest at {manifest_path}"
+    )
+    return manifest
+
+def primary_artifact(manifest):
+    """The APK linked as the version's main download"""
+    apks = [a for a in manifest["artifacts"] if a["format"] == "apk"] or manifest["artifacts"]
+    for abi in PRIMARY_ABIS:
+        for artifact in apks:
+            if artifact["abi"] == abi:
+                if abi != "universal":
+                    warn(f"No universal APK built, downloadUrl points to {artifact['name']}, "
+                         "which not every device can install")
+                return artifact
+    return apks[0]
 
 # -------------------
 # CONSTANTS FILE UPDATE
 # -------------------
-def update_constants_file(version, changelog, download_url):
+def update_constants_file(version, changelog, manifest):
     with open(CONSTANTS_FILE, "r") as f:
         content = f.read()
 
@@ -180,6 +671,19 @@ def update_constants_file(version, changelog, download_url):
     last_build = max([int(num) for num in re.findall(r"buildNumber:\s*(\d+)", content)] or [0])
     build_number = last_build + 1
     today = date.today().isoformat()
+    download_url = primary_artifact(manifest)["url"]
+    artifacts = "".join(
+        f"""
+      {{
+        name: "{a['name']}",
+        format: "{a['format']}",
+        abi: "{a['abi']}",{f'{chr(10)}        flavor: "{a["flavor"]}",' if a["flavor"] else ""}
+        url: "{a['url']}",
+        size: {a['size']},
+        sha256: "{a['sha256']}",
+      }},"""
+        for a in manifest["artifacts"]
+    )
 
     new_entry = f"""  {{
     version: "{version}",
@@ -188,6 +692,8 @@ def update_constants_file(version, changelog, download_url):
     changelog:
       "{changelog}",
     downloadUrl: "{download_url}",
+    artifacts: [{artifacts}
+    ],
   }},"""
 
         
@@ -204,27 +710,211 @@ def update_constants_file(version, changelog, download_url):
 
     success(f"constants.ts updated with version {version} (build {build_number})")
 
+# -------------------
+# PIPELINE
+# -------------------
+class Pipeline:
+    """Runs each stage as soon as the stages it depends on have finished.
+
+    A stage receives the results of its dependencies as arguments. Stages can
+    only depend on stages added before them, so the graph has no cycles. When
+    a stage fails, stages already running finish but nothing new starts.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        # name -> {"start", "end", "status"}, start and end relative to run()
+        self.timings = {}
+        self.wall_time = 0.0
+
+    def add(self, name, func, *deps):
+        unknown = [dep for dep in deps if dep not in self.stages]
+        if unknown:
+            raise ValueError(f"Stage {name} depends on unknown stage(s): {', '.join(unknown)}")
+        self.stages[name] = (func, deps)
+
+    def _run_stage(self, name, func, args, origin):
+        timing = self.timings[name] = {"start": time.monotonic() - origin, "end": None, "status": "running"}
+        try:
+            result = func(*args)
+            timing["status"] = "ok"
+            return result
+        except BaseException:
+            timing["status"] = "failed"
+            raise
+        finally:
+            timing["end"] = time.monotonic() - origin
+
+    def run(self):
+        """Run every stage and return their results by name, raising the first failure"""
+        origin = time.monotonic()
+        results = {}
+        pending = dict(self.stages)
+        running = {}
+        failure = None
+        with ThreadPoolExecutor(max_workers=len(self.stages) or 1) as pool:
+            while True:
+                if failure is None:
+                    for name, (func, deps) in list(pending.items()):
+                        if all(dep in results for dep in deps):
+                            del pending[name]
+                            future = pool.submit(self._run_stage, name, func, [results[d] for d in deps], origin)
+                            running[future] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        failure = failure or e
+                        error(f"Stage {name} failed: {e}")
+        for name in pending:
+            self.timings[name] = {"start": None, "end": None, "status": "skipped"}
+        self.wall_time = time.monotonic() - origin
+        if failure is not None:
+            raise failure
+        return results
+
+    def print_timings(self):
+        step("Stage timings")
+        for name in self.stages:
+            timing = self.timings.get(name, {"status": "skipped"})
+            if timing["status"] == "skipped":
+                print(f"  {name:<10} {'skipped':>9}")
+                continue
+            duration = timing["end"] - timing["start"]
+            mark = f"{Colors.OKGREEN}✔{Colors.ENDC}" if timing["status"] == "ok" else f"{Colors.FAIL}✘{Colors.ENDC}"
+            print(f"  {name:<10} {duration:8.2f}s  (started at +{timing['start']:.2f}s) {mark}")
+        total = sum(t["end"] - t["start"] for t in self.timings.values() if t["end"] is not None)
+        info(f"Wall clock {self.wall_time:.2f}s, stages took {total:.2f}s in total")
+
 # -------------------
 # MAIN
 # -------------------
-if __name__ == "__main__":
-    step("Fetching version & branch")
+def collect_release_info():
     version = get_flutter_version()
     branch = get_current_branch()
     info(f"Version: {version}, Branch: {branch}")
-
-    step("Collecting commits")
     commits = get_git_commits(BASE_BRANCH, branch)
     info(f"Found {len(commits)} commits unique to this branch")
+    return version, commits
 
-    step("Generating blog post")
-    excerpt = create_blog_post(version, commits)
-
-    step("Building and exporting APK")
-    download_url = build_and_move_apk(version)
-
-    step("Updating constants.ts")
-    update_constants_file(version, excerpt, download_url)
-
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the release APK and publish its blog post and constants.ts entry. "
+        "Release notes are generated while the APK builds."
+    )
+    parser.add_argument(
+        "--notes-backend",
+        choices=sorted(NOTES_BACKENDS),
+        default="gemini",
+        help="Release notes generator; 'stub' works offline without GOOGLE_API_KEY (default: gemini)",
+    )
+    parser.add_argument(
+        "--notes-timeout",
+        type=float,
+        default=NOTES_TIMEOUT,
+        metavar="SECONDS",
+        help=f"Time limit per release notes request (default: {NOTES_TIMEOUT})",
+    )
+    parser.add_argument(
+        "--notes-attempts",
+        type=int,
+        default=NOTES_ATTEMPTS,
+        metavar="N",
+        help="Attempts at generating the release notes, including the first; failed ones are "
+        f"retried with exponential backoff (default: {NOTES_ATTEMPTS})",
+    )
+    parser.add_argument(
+        "--notes-stub-delay",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="Simulated model latency of the stub backend, e.g. to time the release or hit --notes-timeout",
+    )
+    parser.add_argument(
+        "--notes-stub-failures",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Make the stub backend's first N calls fail with a connection error, to exercise the retries",
+    )
+    parser.add_argument(
+        "--no-notes-cache",
+        action="store_true",
+        help="Generate the release notes again even if this version and commits were seen before",
+    )
+    parser.add_argument(
+        "--abi",
+        action="append",
+        choices=sorted(TARGET_PLATFORMS) + ["universal"],
+        help="ABI to build (repeatable; default: " + ", ".join(RELEASE_MATRIX["abis"]) + ")",
+    )
+    parser.add_argument(
+        "--flavor",
+        action="append",
+        help="Gradle product flavor to build (repeatable; default: the project's single variant)",
+    )
+    parser.add_argument(
+        "--format",
+        action="append",
+        choices=["apk", "appbundle"],
+        help="Artifact format (repeatable; default: " + ", ".join(RELEASE_MATRIX["formats"]) + ")",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=2,
+        metavar="N",
+        help="Concurrent builds, each in its own copy of the build inputs under "
+        f"{WORKSPACES_DIR} with its own build/ directory (default: 2)",
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="Always run flutter clean and rebuild, even if the build inputs are unchanged",
+    )
+    args = parser.parse_args()
+    matrix = {
+        "abis": args.abi or RELEASE_MATRIX["abis"],
+        "flavors": args.flavor or RELEASE_MATRIX["flavors"],
+        "formats": args.format or RELEASE_MATRIX["formats"],
+    }
+
+    step("Fetching version, branch & commits")
+    pipeline = Pipeline()
+    pipeline.add("info", collect_release_info)
+    # Notes and build only need the version and commits, so they run side by side
+    if args.notes_backend == "stub":
+        backend = StubBackend(delay=args.notes_stub_delay, failures=args.notes_stub_failures)
+    elif args.notes_stub_delay or args.notes_stub_failures:
+        parser.error("--notes-stub-delay and --notes-stub-failures need --notes-backend stub")
+    else:
+        backend = NOTES_BACKENDS[args.notes_backend]()
+    notes_options = {
+        "timeout": args.notes_timeout,
+        "attempts": max(1, args.notes_attempts),
+        "use_cache": not args.no_notes_cache,
+    }
+    pipeline.add("notes", lambda release: create_blog_post(*release, backend, **notes_options), "info")
+    pipeline.add("build", lambda release: build_release_matrix(release[0], matrix, args.jobs, args.clean), "info")
+    pipeline.add(
+        "constants",
+        lambda release, excerpt, manifest: update_constants_file(release[0], excerpt, manifest),
+        "info", "notes", "build",
+    )
+    try:
+        results = pipeline.run()
+    except Exception:
+        pipeline.print_timings()
+        raise SystemExit(1)
+    pipeline.print_timings()
+
+    version, _ = results["info"]
     step("🎉 Release complete")
-    success(f"Version {version} packaged, blog + constants updated!")
\ No newline at end of file
+    success(f"Version {version} packaged, blog + constants updated!")
+
+if __name__ == "__main__":
+    main()
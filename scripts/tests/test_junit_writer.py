@@ -0,0 +1,84 @@
+"""
+JUnit XML Writer Tests
+Drives `flutter test --machine` output through the runner's parser into the
+JUnit XML writer and checks what a CI dashboard would show for each failure
+
+Usage: python -m pytest scripts/tests
+"""
+
+import json
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from flutter_test_runner import FlutterTestRunner  # noqa: E402
+from test_result_writers import JUnitXmlWriter  # noqa: E402
+
+WIDGET_EXCEPTION = "\n".join([
+    "══╡ EXCEPTION CAUGHT BY FLUTTER TEST FRAMEWORK ╞════════════════════════════════════════════════════",
+    "The following TestFailure was thrown running a test:",
+    "Expected: exactly one matching candidate",
+    "  Actual: _TextWidgetFinder:<Found 0 widgets with text \"1\": []>",
+    "   Which: means none were found but one was expected",
+    "",
+    "When the exception was thrown, this was the stack:",
+    "#4      main.<anonymous closure> (file:///app/test/widget_test.dart:24:5)",
+    "<asynchronous suspension>",
+    "#5      testWidgets.<anonymous closure>.<anonymous closure> "
+    "(package:flutter_test/src/widget_tester.dart:189:15)",
+    "<asynchronous suspension>",
+    "",
+    "The test description was:",
+    "  counter increments",
+    "════════════════════════════════════════════════════════════════════════════════════════════════════",
+])
+
+# Events in the order `flutter test --machine` emits them for one suite
+MACHINE_EVENTS = [
+    {"type": "suite", "suite": {"id": 0, "platform": "vm", "path": "test/widget_test.dart"}, "time": 0},
+    {"type": "group", "group": {"id": 1, "suiteID": 0, "name": ""}, "time": 5},
+    {"type": "testStart", "test": {"id": 2, "name": "adds", "suiteID": 0, "groupIDs": [1]}, "time": 10},
+    {"type": "error", "testID": 2, "error": "Expected: <3>\n  Actual: <2>\n",
+     "stackTrace": "package:matcher                   expect\n"
+                   "test/widget_test.dart 31:5        main.<fn>\n",
+     "isFailure": True, "time": 20},
+    {"type": "testDone", "testID": 2, "result": "failure", "skipped": False, "hidden": False, "time": 25},
+    {"type": "testStart", "test": {"id": 3, "name": "counter increments", "suiteID": 0, "groupIDs": [1]},
+     "time": 30},
+    {"type": "print", "testID": 3, "messageType": "print", "message": WIDGET_EXCEPTION, "time": 40},
+    {"type": "error", "testID": 3, "error": "Test failed. See exception logs above.\n"
+                                            "The test description was: counter increments",
+     "stackTrace": "", "isFailure": False, "time": 41},
+    {"type": "testDone", "testID": 3, "result": "error", "skipped": False, "hidden": False, "time": 45},
+    {"type": "done", "success": False, "time": 50},
+]
+
+
+def run_machine_output(tmp_path):
+    report = tmp_path / "junit.xml"
+    runner = FlutterTestRunner(live=False, reporter='json')
+    writer = JUnitXmlWriter(str(report))
+    runner.listeners = [writer]
+    for event in MACHINE_EVENTS:
+        runner.feed_line(json.dumps(event))
+    runner.finish_parsing()
+    writer.close()
+    return {case.get('name'): case for case in ET.parse(report).iter('testcase')}
+
+
+def test_expect_failure_reports_message_and_frames(tmp_path):
+    failure = run_machine_output(tmp_path)['adds'].find('failure')
+    assert failure.get('message') == 'Expected: <3>'
+    assert failure.get('type') == 'Test failure'
+    assert 'Actual: <2>' in failure.text
+    assert 'test/widget_test.dart 31:5        main.<fn>' in failure.text
+
+
+def test_printed_widget_exception_is_the_failure(tmp_path):
+    failures = run_machine_output(tmp_path)['counter increments'].findall('failure')
+    assert len(failures) == 1
+    assert failures[0].get('message') == 'The following TestFailure was thrown running a test:'
+    assert failures[0].get('type') == 'FLUTTER TEST FRAMEWORK'
+    assert 'file:///app/test/widget_test.dart:24:5' in failures[0].text
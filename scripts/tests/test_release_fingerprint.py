@@ -0,0 +1,49 @@
+"""
+Release Fingerprint Tests
+Checks which changes to the Flutter project move the build fingerprint that
+scripts/release.py keys its artifact store and clean decisions by
+
+Usage: python -m pytest scripts/tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import release  # noqa: E402
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "lib" / "main.dart").write_text("void main() {}\n")
+    (tmp_path / "android" / "app").mkdir(parents=True)
+    (tmp_path / "android" / "app" / "build.gradle").write_text("android {}\n")
+    (tmp_path / "android" / "local.properties").write_text(
+        "flutter.sdk=/opt/flutter\nflutter.buildMode=debug\nflutter.versionCode=1\n"
+    )
+    (tmp_path / "pubspec.yaml").write_text("name: app\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(release, "flutter_toolchain", lambda: '{"frameworkVersion": "3.24.0"}')
+    return tmp_path
+
+
+def test_local_properties_rewrite_keeps_fingerprint(project):
+    fingerprint, inputs = release.build_fingerprint()
+    # What `flutter build apk --release` leaves behind
+    (project / "android" / "local.properties").write_text(
+        "flutter.sdk=/opt/flutter\nflutter.buildMode=release\nflutter.versionCode=42\n"
+    )
+    assert release.build_fingerprint() == (fingerprint, inputs)
+
+
+def test_gradle_change_moves_fingerprint(project):
+    fingerprint, inputs = release.build_fingerprint()
+    (project / "android" / "app" / "build.gradle").write_text("android { compileSdk 34 }\n")
+    new_fingerprint, new_inputs = release.build_fingerprint()
+    assert new_fingerprint != fingerprint
+    assert new_inputs["android"] != inputs["android"]
+    assert new_inputs["lib"] == inputs["lib"]
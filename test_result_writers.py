@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test Result Writers
+Machine-readable reports (JUnit XML, JSON) for CI dashboards, written one
+test at a time as the runner reports each test finishing
+"""
+
+import json
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from xml.sax.saxutils import escape, quoteattr
+
+# Characters XML 1.0 cannot represent at all, e.g. the ESC of ANSI colour codes in test output
+INVALID_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def xml_text(text: str) -> str:
+    return escape(INVALID_XML_CHARS.sub('', text))
+
+
+def xml_attr(text: str) -> str:
+    return quoteattr(INVALID_XML_CHARS.sub('', text))
+
+
+class ResultWriter(ABC):
+    """Base class for writers that receive tests as they finish.
+
+    Subclasses write the test in test_finished() and whatever depends on the
+    totals in close().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.tests = 0
+        self.failures = 0
+        self.skipped = 0
+        self._started = time.monotonic()
+
+    def test_finished(self, test):
+        self.tests += 1
+        if test.status == 'FAILED':
+            self.failures += 1
+        elif test.status == 'SKIPPED':
+            self.skipped += 1
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._started
+
+    @abstractmethod
+    def close(self):
+        """Finish the report"""
+
+
+class JUnitXmlWriter(ResultWriter):
+    """JUnit XML report with one <testcase> per test.
+
+    The counts on <testsuite> are only known at the end, so its opening tag is
+    padded with whitespace to a fixed width and rewritten in place on close.
+    """
+    SUITE_TAG_WIDTH = 200
+
+    def __init__(self, path: str, suite_name: str = 'flutter test'):
+        super().__init__(path)
+        self.suite_name = suite_name
+        self.timestamp = datetime.now().isoformat(timespec='seconds')
+        self._file = open(path, 'wb')
+        self._file.write(b'<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n')
+        self._suite_tag_offset = self._file.tell()
+        self._file.write(self._suite_tag())
+
+    def _suite_tag(self) -> bytes:
+        tag = (f'  <testsuite name={xml_attr(self.suite_name)} tests="{self.tests}" '
+               f'failures="{self.failures}" errors="0" skipped="{self.skipped}" '
+               f'time="{self.elapsed:.3f}" timestamp="{self.timestamp}"')
+        return f'{tag.ljust(self.SUITE_TAG_WIDTH - 1)}>\n'.encode('utf-8')
+
+    def test_finished(self, test):
+        super().test_finished(test)
+        classname = test.file[:-len('.dart')] if test.file.endswith('.dart') else test.file
+        duration = (test.duration_ms or 0) / 1000
+        lines = [
+            f'    <testcase classname={xml_attr(classname.replace("/", "."))} '
+            f'name={xml_attr(test.name)} file={xml_attr(test.file)} time="{duration:.3f}"'
+        ]
+        body = []
+        if test.status == 'SKIPPED':
+            body.append('      <skipped/>')
+        elif test.status == 'FAILED':
+            for error in test.errors or ():
+                raw = error.full_stack
+                message = error.message or error.exception_type or raw.partition('\n')[0] or error.type
+                frames = error.stack_trace
+                # A block nothing could be parsed out of is reported as it was printed
+                details = [error.full_message or message, *frames] if frames else [raw]
+                if test.rerun_command:
+                    details.append(f'To run this test again: {test.rerun_command}')
+                body.append(
+                    f'      <failure message={xml_attr(message)} '
+                    f'type={xml_attr(error.type)}>{xml_text(chr(10).join(filter(None, details)))}</failure>'
+                )
+            if not test.errors:
+                # No error event was parsed; what the test printed is the best account of the failure
+                details = list(test.output or ())
+                if test.rerun_command:
+                    details.append(f'To run this test again: {test.rerun_command}')
+                body.append(f'      <failure message="Test failed">{xml_text(chr(10).join(filter(None, details)))}</failure>')
+            if test.output:
+                body.append(f'      <system-out>{xml_text(chr(10).join(test.output))}</system-out>')
+        if body:
+            lines[0] += '>'
+            lines.extend(body)
+            lines.append('    </testcase>')
+        else:
+            lines[0] += '/>'
+        self._file.write(('\n'.join(lines) + '\n').encode('utf-8'))
+
+    def close(self):
+        self._file.write(b'  </testsuite>\n</testsuites>\n')
+        self._file.seek(self._suite_tag_offset)
+        self._file.write(self._suite_tag())
+        self._file.close()
+
+
+class JsonResultWriter(ResultWriter):
+    """JSON report: a "tests" array that grows as tests finish, followed by the totals"""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write('{"tests": [')
+
+    def test_finished(self, test):
+        separator = ',\n' if self.tests else '\n'
+        super().test_finished(test)
+        self._file.write(separator + json.dumps(test.to_dict(), ensure_ascii=False))
+
+    def close(self):
+        summary = {
+            'tests': self.tests,
+            'passed': self.tests - self.failures - self.skipped,
+            'failed': self.failures,
+            'skipped': self.skipped,
+            'time': round(self.elapsed, 3),
+            'finished_at': datetime.now().isoformat(timespec='seconds')
+        }
+        self._file.write(f'\n], "summary": {json.dumps(summary)}}}\n')
+        self._file.close()